@@ -86,6 +86,7 @@ import os
 from six import string_types as basestring
 
 from railgun.simobj import SimObject, CDT2DTYPE
+from railgun.simobjarray import SimObjectArray
 from railgun._helper import HybridObj
 from railgun.cdata import cmem
 
@@ -0,0 +1,133 @@
+"""
+cffi backend of C function calls (see `SimObject._cbackend_`)
+
+The C struct and the prototypes of the C functions are declared to
+cffi (ABI mode, i.e., no compiler is needed) from the same parsed
+`_cmembers_` and `_cfuncs_` used for the ctypes struct.  The memory of
+the struct is still owned by the ctypes struct (`SimObject._struct_`),
+so arrays and `SimObjectArray` share it with NumPy as before; cffi
+only sees a typed pointer to it.  As cffi converts arguments faster
+than ctypes, the overhead per call is smaller.
+
+"""
+
+from ctypes import addressof, sizeof, _Pointer, c_void_p, c_char_p
+
+try:
+    import cffi
+except ImportError:
+    cffi = None
+
+CDT2CNAME = dict(char='char',
+                 short='short', ushort='unsigned short',
+                 int='int', uint='unsigned int',
+                 long='long', ulong='unsigned long',
+                 longlong='long long', ulonglong='unsigned long long',
+                 float='float', double='double',
+                 longdouble='long double',
+                 bool='_Bool', size_t='size_t',
+                 )
+
+
+def member_cdecl(parsed):
+    """
+    C declaration of the struct field for parsed C member
+
+    >>> from railgun.cdata import cddec_parse
+    >>> member_cdecl(cddec_parse('double a[i][j]'))
+    'double **a'
+    >>> member_cdecl(cddec_parse('int num_i'))
+    'int num_i'
+
+    """
+    if parsed.valtype == 'object':
+        ctype = parsed.cdt._ctype_
+        if not issubclass(ctype, (_Pointer, c_void_p, c_char_p)):
+            raise ValueError(
+                'C member %s of type %r is not supported by the cffi '
+                'backend (only pointers are)' % (parsed.vname, ctype))
+        return 'void *%s' % parsed.vname
+    if parsed.valtype == 'scalar':
+        stars = ''
+    elif parsed.carrtype == 'flat':
+        stars = '*'
+    else:
+        stars = '*' * parsed.ndim
+    return '%s %s%s' % (CDT2CNAME[parsed.cdt], stars, parsed.vname)
+
+
+def struct_cdef(cstructname, cmems_parsed_list):
+    """
+    C definition of the struct for cffi
+    """
+    fields = ''.join('    %s;\n' % member_cdecl(parsed)
+                     for parsed in cmems_parsed_list)
+    return 'struct %s {\n%s};\n' % (cstructname, fields)
+
+
+def cfunc_cdecl(name, cstructname, parsed, idxset):
+    """
+    C prototype of the C function `name` for cffi
+    """
+    args = ['struct %s *' % cstructname]
+    for ag in parsed.args:
+        if ag['aname'] in idxset or ag['cdt'] in idxset:
+            args.append('int')
+        else:
+            args.append(CDT2CNAME[ag['cdt']])
+    return 'int %s(%s);\n' % (name, ', '.join(args))
+
+
+class CFFILibrary(object):
+
+    """
+    C library loaded by cffi together with the declaration of its struct
+
+    :arg str path: path to the shared library
+    :arg str cstructname: name of the C struct
+    :arg list cmems_parsed_list: parsed C members (in order)
+    :arg struct_type: ctypes struct made from `cmems_parsed_list`;
+                      its layout must agree with the cffi one
+    :arg str cfuncprefix: prefix of C function names
+    :arg dict declarations: see `railgun.simobj.cfunc_declarations`
+    :arg set idxset: names of indices
+
+    """
+
+    def __init__(self, path, cstructname, cmems_parsed_list, struct_type,
+                 cfuncprefix, declarations, idxset):
+        if cffi is None:
+            raise ImportError(
+                "cffi is required to use _cbackend_ = 'cffi'")
+        self.ffi = ffi = cffi.FFI()
+        ffi.cdef(struct_cdef(cstructname, cmems_parsed_list) + ''.join(
+            cfunc_cdecl(cfuncprefix + name, cstructname, parsed, idxset)
+            for (name, parsed) in sorted(declarations.items())))
+        self._name = path  # same as `ctypes.CDLL`
+        self._ctype_p = ffi.typeof('struct %s *' % cstructname)
+        self._check_layout('struct %s' % cstructname, struct_type)
+        self.lib = ffi.dlopen(path)
+
+    def _check_layout(self, cname, struct_type):
+        ffi = self.ffi
+        layout = [(name, getattr(struct_type, name).offset)
+                  for (name, _) in struct_type._fields_]
+        if (ffi.sizeof(cname) != sizeof(struct_type) or
+                any(ffi.offsetof(cname, name) != offset
+                    for (name, offset) in layout)):
+            raise ValueError(
+                'layout of %s differs between cffi and ctypes' % cname)
+
+    def pointer(self, struct):
+        """
+        Typed cffi pointer to `struct`, an instance of the ctypes struct
+
+        The pointer does not keep `struct` alive.
+        """
+        return self.ffi.cast(self._ctype_p, addressof(struct))
+
+    def function(self, name):
+        """
+        C function `name` (AttributeError is raised if not found)
+        """
+        return getattr(self.lib, name)
@@ -96,14 +96,34 @@ def cfdec_fname_parse(rawfname):
                  ))
 
     fsplit = RE_CFDEC_CHOSET_SPLIT.split(rawfname)
-    def fnget(*args):
-        choicelist = args
-        return ''.join(iteralt(fsplit, choicelist))
-    fnget.func_name = 'fnget_%s' % fname
+    fnget = FuncNameGetter(fsplit, fname)
 
     return (fname, choset, fnget)
 
 
+class FuncNameGetter(object):
+
+    """
+    Construct C function name from given choices
+
+    This is a class rather than a closure so that parsed declarations
+    can be pickled (see `railgun.speccache`).
+
+    >>> fnget = FuncNameGetter(['func_', '_', ''], 'func')
+    >>> fnget('a', 'x')
+    'func_a_x'
+
+    """
+
+    def __init__(self, fsplit, fname):
+        self.fsplit = fsplit
+        self.func_name = 'fnget_%s' % fname
+
+    def __call__(self, *args):
+        choicelist = args
+        return ''.join(iteralt(self.fsplit, choicelist))
+
+
 cfdec_parse = _CFunctionDeclaration.from_string
 
 
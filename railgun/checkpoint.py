@@ -0,0 +1,133 @@
+"""
+Checkpoints of `SimObject` as a directory of ``.npy`` files
+
+A checkpoint is a directory containing
+
+- one ``.npy`` file for each allocated array C member and
+- ``header.json`` holding the scalar C members (including ``num_*``),
+  the flags of `_cmemsubsets_` and the list of the array files.
+
+Array files are written in chunks (see `write_npy`) and renamed into
+place when complete.  The header is written last, so that a directory
+without the header is an incomplete checkpoint.  Writing can be done
+in a background thread (see `write_async`).
+
+See :meth:`railgun.SimObject.save` and :meth:`railgun.SimObject.load`.
+
+"""
+
+import json
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy
+
+FORMAT = 'railgun-checkpoint'
+VERSION = 1
+HEADER = 'header.json'
+
+# Bytes written at once by `write_npy`:
+CHUNKBYTES = 16 * 1024 * 1024
+
+
+def write_npy(filename, arr, chunkbytes=CHUNKBYTES):
+    """
+    Write `arr` to ``.npy`` file `filename` by chunks along axis 0
+
+    Each chunk is at most `chunkbytes` (or one row along the first
+    axis if it is larger).  `arr` does not need to be contiguous.
+    The file is written as ``filename + '.tmp'`` and then renamed.
+
+    >>> import tempfile
+    >>> filename = os.path.join(tempfile.mkdtemp(), 'a.npy')
+    >>> arr = numpy.arange(12).reshape((3, 4))[:, :3]
+    >>> write_npy(filename, arr, chunkbytes=8)
+    >>> numpy.load(filename).tolist()
+    [[0, 1, 2], [4, 5, 6], [8, 9, 10]]
+
+    """
+    fmt = numpy.lib.format
+    tmpname = filename + '.tmp'
+    step = max(1, chunkbytes // max(arr[:1].nbytes, 1))
+    with open(tmpname, 'wb') as f:
+        header = fmt.header_data_from_array_1_0(arr)
+        header['fortran_order'] = False  # chunks are written in C order
+        fmt.write_array_header_1_0(f, header)
+        for start in range(0, len(arr), step):
+            f.write(numpy.ascontiguousarray(arr[start:start + step]).data)
+    os.rename(tmpname, filename)
+
+
+def write(path, header, arrays, chunkbytes=CHUNKBYTES, threads=1):
+    """
+    Write checkpoint to directory `path` (created if not exist)
+
+    `header` is a dict to be saved in the header with the list of
+    array files.  `arrays` is a dict of arrays.  Arrays are written
+    by `threads` threads in parallel.
+    """
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    headerpath = os.path.join(path, HEADER)
+    if os.path.exists(headerpath):
+        os.remove(headerpath)  # the directory is incomplete until the end
+    files = dict((name, name + '.npy') for name in arrays)
+    jobs = [(os.path.join(path, files[name]), arr, chunkbytes)
+            for (name, arr) in sorted(arrays.items())]
+    if threads > 1 and len(jobs) > 1:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(lambda job: write_npy(*job), jobs))
+    else:
+        for job in jobs:
+            write_npy(*job)
+    header = dict(header, format=FORMAT, version=VERSION, arrays=files)
+    with open(headerpath + '.tmp', 'w') as f:
+        json.dump(header, f, indent=2, sort_keys=True)
+    os.rename(headerpath + '.tmp', headerpath)
+
+
+def write_async(*args, **kwds):
+    """
+    Run `write` in a new thread and return a `concurrent.futures.Future`
+
+    The thread is not a daemon, so that the interpreter waits for the
+    checkpoint to be completed before exit.
+    """
+    future = Future()
+    future.set_running_or_notify_cancel()
+
+    def run():
+        try:
+            write(*args, **kwds)
+        except BaseException as err:
+            future.set_exception(err)
+        else:
+            future.set_result(None)
+
+    threading.Thread(target=run, name='railgun-checkpoint').start()
+    return future
+
+
+def read(path, mmap_mode=None):
+    """
+    Read checkpoint in directory `path`
+
+    Return a tuple ``(header, arrays)``, where `arrays` is a dict of
+    arrays loaded by :func:`numpy.load` with `mmap_mode`.
+    ValueError is raised if `path` is not a complete checkpoint.
+    """
+    headerpath = os.path.join(path, HEADER)
+    if not os.path.exists(headerpath):
+        raise ValueError('%s is not a (complete) checkpoint: no %s'
+                         % (path, HEADER))
+    with open(headerpath) as f:
+        header = json.load(f)
+    if header.get('format') != FORMAT or header.get('version') != VERSION:
+        raise ValueError('%s is not a checkpoint of version %d'
+                         % (headerpath, VERSION))
+    arrays = {}
+    for (name, filename) in header['arrays'].items():
+        arrays[name] = numpy.load(os.path.join(path, filename),
+                                  mmap_mode=mmap_mode)
+    return (header, arrays)
@@ -0,0 +1,150 @@
+"""
+Page policies (huge pages and pre-faulting) of array C members
+
+Memory of a freshly allocated array is mapped lazily by the OS: the
+first access to each page causes a page fault.  For arrays of
+gigabytes, the first C function call pays for millions of faults.
+This module allocates memory by anonymous `mmap` so that
+
+- transparent huge pages can be requested by ``madvise(MADV_HUGEPAGE)``
+  (Linux only), which reduces page faults and TLB misses, and
+- all pages can be touched (pre-faulted) at allocation by several
+  threads, so that the cost is paid at construction and, on NUMA
+  machines, the pages are spread over the nodes of the threads.
+
+See `SimObject._chugepages_` and `SimObject._cprefault_`.
+
+"""
+
+import mmap
+import multiprocessing
+import re
+import threading
+
+import numpy
+
+PAGESIZE = mmap.PAGESIZE
+
+# Size of transparent huge pages on x86-64 and (4K-page) arm64:
+HUGEPAGESIZE = 2 * 1024 * 1024
+
+THP_ENABLED = '/sys/kernel/mm/transparent_hugepage/enabled'
+
+
+def thp_mode():
+    """
+    System-wide mode of transparent huge pages
+
+    Returns ``'always'``, ``'madvise'`` or ``'never'``, or None if
+    unknown (e.g., not Linux).
+    """
+    try:
+        with open(THP_ENABLED) as f:
+            match = re.search(r'\[(\w+)\]', f.read())
+    except (IOError, OSError):
+        return None
+    return match.group(1) if match else None
+
+
+class PagedBuffer(mmap.mmap):
+
+    """
+    Anonymous memory map which remembers the applied page policy
+
+    .. attribute:: hugepages
+
+       True if ``madvise(MADV_HUGEPAGE)`` succeeded and the system
+       does not disable transparent huge pages.
+
+    .. attribute:: prefault
+
+       Number of threads used to pre-fault the pages (0 if not).
+
+    """
+
+    hugepages = False
+    prefault = 0
+
+
+def prefault(arr, nthreads):
+    """
+    Touch every page of uint8 array `arr` using `nthreads` threads
+    """
+    npages = -(-len(arr) // PAGESIZE)
+    nthreads = max(1, min(nthreads, npages))
+    bounds = [npages * k // nthreads * PAGESIZE for k in range(nthreads + 1)]
+
+    def touch(start, stop):
+        # numpy releases the GIL while filling, so threads run in parallel
+        arr[start:stop:PAGESIZE] = 0
+
+    threads = [threading.Thread(target=touch, args=(a, b))
+               for (a, b) in zip(bounds[:-1], bounds[1:])]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return nthreads
+
+
+def alloc_pages(nbytes, hugepages=False, prefault_threads=0):
+    """
+    Allocate zero-filled uint8 array of `nbytes` by anonymous `mmap`
+
+    The address is a multiple of the page size (of `HUGEPAGESIZE` if
+    `hugepages` is true).  If `prefault_threads` is given, the pages
+    are pre-faulted by that number of threads (all CPUs if True).
+    The policy which took effect is available via :func:`policy_of`.
+
+    >>> arr = alloc_pages(10000, prefault_threads=2)
+    >>> (len(arr), arr.ctypes.data % PAGESIZE, int(arr.sum()))
+    (10000, 0, 0)
+    >>> policy_of(arr)['prefault']
+    2
+
+    """
+    size = max(nbytes, 1)
+    if hugepages:
+        size += HUGEPAGESIZE  # room to align to a huge page
+    buf = PagedBuffer(-1, size)
+    raw = numpy.frombuffer(buf, dtype=numpy.uint8)
+    if hugepages:
+        advice = getattr(mmap, 'MADV_HUGEPAGE', None)  # Python >= 3.8
+        if advice is not None and thp_mode() != 'never':
+            try:
+                buf.madvise(advice)
+                buf.hugepages = True
+            except (OSError, ValueError):
+                pass
+        offset = -raw.ctypes.data % HUGEPAGESIZE
+        raw = raw[offset:offset + nbytes]
+    else:
+        raw = raw[:nbytes]
+    if prefault_threads:
+        if prefault_threads is True:
+            prefault_threads = multiprocessing.cpu_count()
+        buf.prefault = prefault(raw, prefault_threads)
+    return raw
+
+
+def buffer_of(arr):
+    """`PagedBuffer` holding the memory of `arr` or None"""
+    base = arr
+    while base is not None:
+        if isinstance(base, PagedBuffer):
+            return base
+        base = getattr(base, 'obj' if isinstance(base, memoryview) else
+                       'base', None)
+
+
+def policy_of(arr):
+    """
+    Page policy of the memory of `arr` as a dict
+
+    Keys are ``'hugepages'`` and ``'prefault'`` (see `PagedBuffer`).
+    Arrays not allocated by :func:`alloc_pages` have neither.
+    """
+    buf = buffer_of(arr)
+    if buf is None:
+        return dict(hugepages=False, prefault=0)
+    return dict(hugepages=buf.hugepages, prefault=buf.prefault)
@@ -0,0 +1,369 @@
+"""
+Run C functions of many `SimObject` instances concurrently
+"""
+
+import collections
+import threading
+import weakref
+
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+import numpy
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+
+class ThreadPoolRunner(object):
+
+    """
+    Call C functions of independent `SimObject` instances on a thread pool
+
+    C functions are loaded via `ctypes.CDLL`, which releases the GIL
+    while the C function is running.  Therefore, C functions of
+    *different* instances run concurrently.  Calls on the *same*
+    instance are serialized.
+
+    Usage::
+
+        with ThreadPoolRunner(max_workers=4) as runner:
+            futures = runner.map(sims, 'run', mode='normal')
+            results = [f.result() for f in futures]
+
+    Result of each future is what ``obj.FUNC_NAME(*args, **kwds)``
+    returns, i.e., the value of the member specified as the returned
+    value of the C function (or None).  Exceptions (such as the ones
+    defined in `_cerrors_`) are set to the futures.
+
+    Note that the C code must be thread-safe (e.g., it must not use
+    global variables).  Use `ProcessPoolRunner` otherwise.
+
+    """
+
+    def __init__(self, max_workers=None, executor=None):
+        """
+        :arg int max_workers:
+            Number of threads (used when `executor` is not given).
+        :arg executor:
+            An instance of `concurrent.futures.Executor` to be used
+            instead of a new `ThreadPoolExecutor`.  It is not shut
+            down by :meth:`shutdown`.
+
+        """
+        if executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=max_workers)
+            self._own_executor = True
+        else:
+            self._executor = executor
+            self._own_executor = False
+        self._locks = weakref.WeakKeyDictionary()
+        self._locks_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def shutdown(self, wait=True):
+        if self._own_executor:
+            self._executor.shutdown(wait=wait)
+
+    def _lock_for(self, obj):
+        with self._locks_lock:
+            return self._locks.setdefault(obj, threading.Lock())
+
+    def submit(self, obj, fname, *args, **kwds):
+        """
+        Call ``obj.FNAME(*args, **kwds)`` in the pool and return a future
+        """
+        method = getattr(obj, fname)
+        lock = self._lock_for(obj)
+
+        def call():
+            with lock:
+                return method(*args, **kwds)
+        return self._executor.submit(call)
+
+    def map(self, objs, fname, *args, **kwds):
+        """
+        Call ``obj.FNAME(*args, **kwds)`` for each `obj` in `objs`
+
+        Returns a list of futures in the same order as `objs`.
+
+        """
+        return [self.submit(obj, fname, *args, **kwds) for obj in objs]
+
+
+if shared_memory is not None:
+
+    class _SharedMemory(shared_memory.SharedMemory):
+
+        """
+        `SharedMemory` which can be garbage collected before its arrays
+
+        Arrays created over the buffer keep the memory mapped.
+        """
+
+        def __del__(self):
+            try:
+                self.close()
+            except (OSError, BufferError):
+                pass
+
+
+def _attach_shared_memory(name):
+    try:
+        return _SharedMemory(name=name, track=False)  # Python >= 3.13
+    except TypeError:
+        return _SharedMemory(name=name)
+
+
+class _SharedMember(object):
+
+    """Marker for the returned value which is the shared array `name`"""
+
+    def __init__(self, name):
+        self.name = name
+
+
+# Shared memory blocks attached by the worker process, in the order
+# of the last use.  Blocks released by the runner (e.g., after
+# `reallocate`) are dropped when the worker is told so.  The least
+# recently used blocks are dropped when there are more than
+# `_MAX_BLOCKS` of them, so that blocks the worker is never told about
+# (see `ProcessPoolRunner._released`) are not mapped forever.
+_worker_blocks = collections.OrderedDict()
+_MAX_BLOCKS = 256
+
+
+def _call_shared(cls, attrs, scalars, objects, arrays, released,
+                 fname, args, kwds):
+    """
+    Rebuild `SimObject` over shared memory and call its C function
+
+    This function is executed in the worker process.  It returns
+    the scalar C members after the call and the returned value.
+    Blocks named in `released` are dropped from the attached blocks.
+
+    """
+    for name in released:
+        _worker_blocks.pop(name, None)  # closed when its arrays are gone
+    carrays = {}
+    for (vname, (name, shape, padded, dtype)) in arrays.items():
+        shm = _worker_blocks.pop(name, None)
+        if shm is None:
+            shm = _attach_shared_memory(name)
+        _worker_blocks[name] = shm
+        carrays[vname] = _shared_view(shm, shape, padded, dtype)
+    while len(_worker_blocks) > max(_MAX_BLOCKS, len(arrays)):
+        _worker_blocks.popitem(last=False)
+    obj = cls.__new__(cls)
+    obj._cmemsubsets_parsed_ = attrs.pop('_cmemsubsets_parsed_')
+    kwds_members = dict(scalars)
+    kwds_members.update(objects)
+    obj._set_all(_carrays_=carrays, **kwds_members)
+    obj.__dict__.update(attrs)
+    for (vname, arr) in carrays.items():
+        if obj._cdatastore_[vname] is not arr:  # padded (see `_cpad_`)
+            obj._replace_carray(vname, arr)
+
+    ret = getattr(obj, fname)(*args, **kwds)
+    for (vname, arr) in carrays.items():
+        if ret is arr:
+            ret = _SharedMember(vname)
+            break
+    return (_scalars_of(obj, skipnum=True), ret)
+
+
+def _shared_view(shm, shape, padded, dtype):
+    """
+    Array of `shape` in shared memory `shm` allocated for `padded`
+
+    The buffer is page-aligned, i.e., it satisfies `_calign_`.
+    """
+    arr = numpy.ndarray(padded, dtype=dtype, buffer=shm.buf)
+    return arr[tuple(slice(0, n) for n in shape)]
+
+
+def _scalars_of(obj, skipnum=False):
+    return dict(
+        (k, getattr(obj, k)) for (k, v) in obj._cmems_parsed_.items()
+        if v.valtype == 'scalar' and not (skipnum and k.startswith('num_')))
+
+
+class ProcessPoolRunner(object):
+
+    """
+    Call C functions of `SimObject` instances in worker processes
+
+    Usage::
+
+        with ProcessPoolRunner(max_workers=4) as runner:
+            futures = runner.map(sims, 'run', mode='normal')
+            results = [f.result() for f in futures]
+
+    Array C members are moved to shared memory (see :meth:`share`)
+    when an instance is passed to the runner for the first time.
+    Workers rebuild the C struct over the same memory, so that
+    arrays are neither pickled nor copied back.  Only the scalar C
+    members, the C member objects (see :func:`railgun.cmem`), the
+    other Python attributes and the arguments are pickled.
+
+    After the call, the scalar C members set by the worker are
+    copied back to the instance.  Changes to the C member objects
+    made by the worker are *not* sent back.  The classes must be
+    importable from the worker processes.
+
+    As in `ThreadPoolRunner`, calls on the same instance are
+    serialized.  The shared memory is released by :meth:`shutdown`.
+    Do not use the shared instances after that.
+
+    """
+
+    def __init__(self, max_workers=None, executor=None):
+        """
+        :arg int max_workers:
+            Number of processes (used when `executor` is not given).
+        :arg executor:
+            An instance of `concurrent.futures.ProcessPoolExecutor` to
+            be used instead of a new one.  It is not shut down by
+            :meth:`shutdown`.
+
+        """
+        if shared_memory is None:
+            raise RuntimeError(
+                'ProcessPoolRunner requires multiprocessing.shared_memory '
+                '(Python >= 3.8)')
+        if executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=max_workers)
+            self._own_executor = True
+        else:
+            self._executor = executor
+            self._own_executor = False
+        self._blocks = {}  # name -> SharedMemory created by this runner
+        # names of recently released blocks, sent to workers:
+        self._released = collections.deque(maxlen=_MAX_BLOCKS)
+        self._last = weakref.WeakKeyDictionary()  # obj -> last future
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def shutdown(self, wait=True):
+        if self._own_executor:
+            self._executor.shutdown(wait=wait)
+        for shm in self._blocks.values():
+            shm.unlink()
+        self._blocks = {}
+
+    def share(self, obj):
+        """
+        Move array C members of `obj` to shared memory
+
+        Arrays are copied once.  Calling this function again is
+        cheap unless arrays are reallocated (e.g., by
+        :meth:`.SimObject.reallocate`), in which case the new arrays
+        are copied and the shared memory of the old ones is released.
+        Returns `obj`.
+
+        """
+        store = obj._cdatastore_
+        for (vname, parsed) in obj._cmems_parsed_.items():
+            if parsed.valtype != 'array' or vname not in store:
+                continue
+            arr = store[vname]
+            key = 'SharedMemory:%s' % vname
+            if key in store and store[key][1] is arr:
+                continue
+            (_, padded) = obj._carray_layout(parsed, arr.shape)
+            nbytes = int(numpy.prod(padded, dtype=numpy.intp)) * arr.itemsize
+            shm = _SharedMemory(create=True, size=max(nbytes, 1))
+            self._blocks[shm.name] = shm
+            sarr = _shared_view(shm, arr.shape, padded, arr.dtype)
+            sarr[...] = arr
+            obj._replace_carray(vname, sarr)
+            if key in store:
+                self._release(store[key][0])
+            store[key] = (shm, sarr, padded)
+        return obj
+
+    def _release(self, shm):
+        """
+        Unlink `shm` if created by this runner
+
+        The memory is freed when all processes close it; this process
+        closes it when arrays over it are garbage collected.
+        """
+        if self._blocks.pop(shm.name, None) is not None:
+            shm.unlink()
+            self._released.append(shm.name)
+
+    def _state_of(self, obj):
+        store = obj._cdatastore_
+        attrs = dict(
+            (k, v) for (k, v) in obj.__dict__.items()
+            if k not in ['_struct_', '_struct_p_', '_cdatastore_'])
+        objects = dict(
+            (k, store[k]) for (k, v) in obj._cmems_parsed_.items()
+            if v.valtype == 'object' and k in store)
+        arrays = {}
+        for (vname, parsed) in obj._cmems_parsed_.items():
+            if parsed.valtype == 'array' and vname in store:
+                (shm, arr, padded) = store['SharedMemory:%s' % vname]
+                arrays[vname] = (shm.name, arr.shape, padded, arr.dtype.str)
+        return (obj.__class__, attrs, _scalars_of(obj), objects, arrays)
+
+    def submit(self, obj, fname, *args, **kwds):
+        """
+        Call ``obj.FNAME(*args, **kwds)`` in a worker and return a future
+        """
+        outer = Future()
+
+        def finish(inner):
+            with self._lock:
+                if self._last.get(obj) is outer:
+                    del self._last[obj]
+            try:
+                (scalars, ret) = inner.result()
+            except BaseException as err:
+                outer.set_exception(err)
+                return
+            obj.setv(**scalars)
+            if isinstance(ret, _SharedMember):
+                ret = getattr(obj, ret.name)
+            outer.set_result(ret)
+
+        def start(prev=None):
+            if not outer.set_running_or_notify_cancel():
+                return
+            try:
+                self.share(obj)
+                inner = self._executor.submit(
+                    _call_shared, *self._state_of(obj) + (
+                        tuple(self._released), fname, args, kwds))
+            except BaseException as err:
+                outer.set_exception(err)
+                return
+            inner.add_done_callback(finish)
+
+        with self._lock:
+            prev = self._last.get(obj)
+            self._last[obj] = outer
+        if prev is None:
+            start()
+        else:
+            prev.add_done_callback(start)
+        return outer
+
+    def map(self, objs, fname, *args, **kwds):
+        """
+        Call ``obj.FNAME(*args, **kwds)`` for each `obj` in `objs`
+
+        Returns a list of futures in the same order as `objs`.
+
+        """
+        return [self.submit(obj, fname, *args, **kwds) for obj in objs]
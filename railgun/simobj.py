@@ -1,21 +1,35 @@
+import ast
+import os
 import re
-from ctypes import Structure, POINTER, pointer, cast
+from ctypes import (Structure, POINTER, pointer, cast, addressof, memmove,
+                    sizeof)
 from ctypes import (c_char, c_short, c_ushort, c_int, c_uint, c_long, c_ulong,
                     c_longlong, c_ulonglong, c_float, c_double, c_longdouble,
                     c_bool, c_size_t)
+import functools
 import platform
+import threading
+import time
 import numpy
 import six
 
 from railgun.cfuncs import cfdec_parse, choice_combinations, CJOINSTR
 from railgun.cdata import cddec_parse
 from railgun.cmemsubsets import CMemSubSets
+from railgun import cffibackend
+from railgun import checkpoint
+from railgun import pages
+from railgun import speccache
 from railgun._helper import (
     dict_override, strset, subdict_by_prefix, subdict_by_filter)
 try:
     from railgun import cstyle
 except ImportError:
     cstyle = None
+try:
+    import asyncio
+except ImportError:
+    asyncio = None
 
 """
 SimObject, its metaclass (MetaSimObject), and helper functions
@@ -36,6 +50,9 @@ VALTYPE : Value Type
 
 """
 
+
+_NOVALUE = object()  # marker for "argument is not given"
+
 CDT2DTYPE = dict(char=numpy.character,
                  short=numpy.short, ushort=numpy.ushort,
                  int=numpy.int32, uint=numpy.uint32,
@@ -72,6 +89,21 @@ DTYPE2CDT.update({
     })
 
 
+def cdt_dtype(cdt):
+    """
+    Dtype of the arrays of `cdt`
+
+    Unlike ``numpy.dtype(CDT2DTYPE[cdt])``, this gives ``S1`` for char.
+
+    >>> cdt_dtype('char')
+    dtype('S1')
+    >>> cdt_dtype('double')
+    dtype('float64')
+
+    """
+    return numpy.empty(0, dtype=CDT2DTYPE[cdt]).dtype
+
+
 def POINTER_nth(ct, n):
     if not isinstance(n, int):
         raise ValueError("only accept int for n")
@@ -81,35 +113,133 @@ def POINTER_nth(ct, n):
         return POINTER_nth(POINTER(ct), n - 1)
 
 
-def as_ndim_pointer(arr, base_POINTER, ctpa, ctpas_remain):
-    if ctpas_remain:
-        next_ctpa = ctpas_remain[0]
-        next_ctpas_remain = ctpas_remain[1:]
-        prow = [as_ndim_pointer(row, base_POINTER, next_ctpa,
-                                next_ctpas_remain) for row in arr]
-        return ctpa(*prow)
+def iliffe_table(arr):
+    """
+    Make Iliffe vector (pointer table) of `arr` as an array of addresses
+
+    Returned array (of dtype `numpy.uintp`) contains the pointers of
+    all levels: ``arr.shape[0]`` pointers to the next level first,
+    then ``arr.shape[0] * arr.shape[1]`` pointers and so on.  The
+    last level points to the rows (``arr[i, j, ..., :]``) of `arr`.
+    Therefore, the address of the returned array can be used as a
+    ``T**...*`` pointer (``arr.ndim`` stars) in C.  `arr` must have
+    at least two dimensions.
+
+    All addresses are computed by numpy from ``arr.ctypes.data`` and
+    the strides, i.e., no Python object is created per row.
+
+    >>> arr = numpy.zeros((2, 3, 4))
+    >>> table = iliffe_table(arr)
+    >>> len(table) == 2 + 2 * 3
+    True
+    >>> int(table[2 + 3 + 1]) == arr[1, 1].ctypes.data
+    True
+
+    """
+    shape = arr.shape
+    counts = numpy.cumprod(shape[:-1], dtype=numpy.intp)
+    starts = numpy.concatenate([[0], numpy.cumsum(counts)])
+    table = numpy.empty(starts[-1], dtype=numpy.uintp)
+    if table.size == 0:
+        return table
+    itemsize = table.itemsize
+    tbase = numpy.intp(table.ctypes.data)
+    # pointers to the next level of the table
+    for k in range(arr.ndim - 2):
+        table[starts[k]:starts[k + 1]] = (
+            tbase + itemsize * starts[k + 1] + itemsize * shape[k + 1] *
+            numpy.arange(counts[k], dtype=numpy.intp))
+    # pointers to the rows of `arr`
+    rows = numpy.intp(arr.ctypes.data)
+    for (num, stride) in zip(shape[:-1], arr.strides[:-1]):
+        rows = numpy.add.outer(
+            rows, stride * numpy.arange(num, dtype=numpy.intp))
+    table[starts[-2]:] = rows.ravel()
+    return table
+
+
+def carray_layout(parsed, shape, calign, cpad):
+    """
+    Alignment and padded shape of array C member (see `SimObject._calign_`)
+
+    >>> from railgun.cdata import cddec_parse
+    >>> carray_layout(cddec_parse('double x[i][j]'), (3, 5), 64, {'x': 4})
+    (64, (3, 8))
+    >>> carray_layout(cddec_parse('double y[i][j]'), (3, 5), None, {'x': 4})
+    (0, (3, 5))
+
+    """
+    vname = parsed.vname
+    (align, pad) = [
+        (opt.get(vname) if isinstance(opt, dict) else opt) or 0
+        for opt in [calign, cpad]]
+    if pad > 1 and shape:
+        if parsed.carrtype == "flat" and len(shape) > 1:
+            raise ValueError(
+                'Multi-dimensional flat array %s cannot be padded, as '
+                'C code indexes it by num_*.' % vname)
+        last = -(-shape[-1] // pad) * pad
+        shape = shape[:-1] + (last,)
+    return (align, shape)
+
+
+def alloc_aligned(shape, dtype, align, zeros=True, hugepages=False,
+                  prefault=0):
+    """
+    Allocate C-contiguous array whose address is a multiple of `align`
+
+    If `hugepages` or `prefault` is given, memory is allocated by
+    :func:`railgun.pages.alloc_pages`.
+
+    >>> arr = alloc_aligned((3, 5), numpy.float64, 64)
+    >>> (arr.shape, arr.ctypes.data % 64, arr.flags.c_contiguous)
+    ((3, 5), 0, True)
+
+    """
+    dtype = numpy.empty(0, dtype=dtype).dtype  # numpy.character -> S1
+    align = max(align, dtype.alignment, 1)
+    nbytes = int(numpy.prod(shape, dtype=numpy.intp)) * dtype.itemsize
+    if hugepages or prefault:
+        raw = pages.alloc_pages(nbytes + align, hugepages, prefault)
     else:
-        prow = [row.ctypes.data_as(base_POINTER) for row in arr]
-        return ctpa(*prow)
+        raw = (numpy.zeros if zeros else numpy.empty)(
+            nbytes + align, dtype=numpy.uint8)
+    offset = -raw.ctypes.data % align
+    return raw[offset:offset + nbytes].view(dtype).reshape(shape)
+
+
+def iliffe_table_nbytes(shape):
+    """
+    Size in bytes of the pointer table of an array of `shape`
+
+    This is the size of the table made by :func:`iliffe_table` and
+    by :class:`railgun.cstyle.CStyle`.
+
+    >>> iliffe_table_nbytes((2, 3, 4)) == sizeof(c_size_t) * (2 + 2 * 3)
+    True
+    >>> iliffe_table_nbytes((5,))
+    0
+
+    """
+    counts = numpy.cumprod(shape[:-1], dtype=numpy.intp)
+    return int(counts.sum()) * sizeof(c_size_t)
 
 
 def ctype_getter(arr):
+    """
+    Get ctypes pointer to `arr` which can be used as ``T*``, ``T**``, etc.
+
+    For multi-dimensional arrays, the pointer table is made by
+    :func:`iliffe_table`.  The returned pointer keeps references
+    to the table.  It is caller's responsibility to keep `arr`.
+    """
     basetype = CDT2CTYPE[DTYPE2CDT[arr.dtype]]
-    base_POINTER = POINTER(basetype)
     if arr.ndim == 1:
-        return arr.ctypes.data_as(base_POINTER)
-    # make list of pointer type such as: int*, int**, int***, ...
-    _P = basetype
-    POINTER_list = []
-    for dummy in range(arr.ndim - 1):
-        _P = POINTER(_P)
-        POINTER_list.append(_P)
-    # callable to allocate N-dim "rows"
-    ctpa_list = []
-    for (i, num) in enumerate(arr.shape[:-1]):
-        ctpa_list.append(POINTER_list[- 1 - i] * num)
-    return as_ndim_pointer(arr, base_POINTER,
-                           ctpa_list[0], tuple(ctpa_list[1:]))
+        return arr.ctypes.data_as(POINTER(basetype))
+    table = iliffe_table(arr)
+    # ctypes array sharing memory with `table` (and keeping it alive)
+    cttable = (c_size_t * len(table)).from_buffer(table)
+    return cast(cttable, POINTER_nth(basetype, arr.ndim))
 
 
 def _gene_prop_scalar(key):
@@ -237,9 +367,13 @@ def get_cargs(self, defaults, kwds, keyorder):
     return [cargs_dict[k] for k in keyorder]
 
 
-def gene_cfpywrap(attrs, cfdec):
+def gene_cfpywrap_generic(attrs, cfdec):
     """
     Generate python function given an object parsed by `cfuncs.cfdec_parse`
+
+    This is the reference implementation of `gene_cfpywrap`.  All
+    arguments are resolved at each call.  It is kept for testing and
+    benchmarking the specialized wrapper against.
     """
     cfkeyorder = [a['aname'] for a in cfdec.args]
     choiceskeyorder = [c['key'] for c in cfdec.choset]
@@ -290,6 +424,274 @@ def gene_cfpywrap(attrs, cfdec):
     return cfpywrap
 
 
+def _cfdec_default(default):
+    """
+    Resolve default of C function argument ahead of time, if possible
+
+    Returns ``(isattr, value)``.  Only numeric, string and
+    True/False/None literals are resolved.  Otherwise `isattr` is
+    true and `value` is the default as is, which must be looked up
+    (or evaluated) at each call (see `get_cargs`).
+
+    >>> _cfdec_default('num_i')
+    (True, 'num_i')
+    >>> _cfdec_default('1e-7')
+    (False, 1e-07)
+    >>> _cfdec_default('True')
+    (False, True)
+    >>> _cfdec_default('numpy.pi')
+    (True, 'numpy.pi')
+
+    """
+    try:
+        value = ast.literal_eval(default)
+    except (ValueError, SyntaxError):
+        return (True, default)
+    if value is None or isinstance(
+            value, (bool, complex, float) + six.integer_types +
+            six.string_types + (bytes,)):
+        return (False, value)
+    return (True, default)
+
+
+def gene_cfbinder(cfdec, idxset):
+    """
+    Generate argument binder given an object parsed by `cfuncs.cfdec_parse`
+
+    Returned function `bind(self, args, kwds)` returns a tuple
+    ``(cfname, cfunc, cargs)``: name of the C function to be called,
+    the loaded C function and the list of arguments for it.  It
+    raises the same errors as `gene_cfpywrap_generic` does.
+
+    Everything which does not depend on the given arguments (order
+    of arguments, defaults and index checks) is computed here, once
+    per class.  C function names for choices are cached on first use.
+
+    """
+    fname = cfdec.fname
+    cfkeyorder = [a['aname'] for a in cfdec.args]
+    choiceskeyorder = [c['key'] for c in cfdec.choset]
+    keyorder = cfkeyorder + choiceskeyorder
+    tailkeys = [keyorder[i:] for i in range(len(keyorder) + 1)]
+    notgiven = (_NOVALUE,) * len(keyorder)
+    ncargs = len(cfkeyorder)
+
+    cdefaults = []
+    for a in cfdec.args:
+        if a['default'] is None:
+            cdefaults.append((None, a['aname']))
+        else:
+            cdefaults.append(_cfdec_default(a['default']))
+
+    default_choices = tuple(c['choices'][0] for c in cfdec.choset)
+    valid_choices = [frozenset(c['choices']) for c in cfdec.choset]
+    cfname_table = {}  # choices -> C function name; filled on demand
+    cfname_nochoice = cfdec.fnget() if not cfdec.choset else None
+
+    idxchecks = []
+    for (i, ag) in enumerate(cfdec.args):
+        idx = ag['cdt']
+        if idx in idxset:
+            if ag['ixt'] == '<':
+                idxchecks.append(
+                    (i, idx, ag['aname'], 1, '1', 1, 'num_%s+1' % idx))
+            else:
+                idxchecks.append(
+                    (i, idx, ag['aname'], 0, '0', 0, 'num_%s' % idx))
+    idxchecks = tuple(idxchecks)
+
+    def bind(self, args, kwds):
+        # put `args` and `kwds` all together to `vals` (ordered by keyorder)
+        if kwds:
+            check_num_args_kwds(args, kwds, keyorder, fname, 1)
+            check_multiple_values(args, kwds, keyorder, fname)
+            vals = tuple(args) + tuple(
+                kwds.get(k, _NOVALUE) for k in tailkeys[len(args)])
+        elif len(args) > len(keyorder):
+            check_num_args_kwds(args, kwds, keyorder, fname, 1)
+        else:
+            vals = args + notgiven[len(args):]
+        # get cfunc
+        if cfname_nochoice is None:
+            choices = tuple(
+                d if v is _NOVALUE else v
+                for (v, d) in zip(vals[ncargs:], default_choices))
+            try:
+                cfname = cfname_table[choices]
+            except KeyError:
+                cfname = cfdec.fnget(*choices)
+                if all(c in v for (c, v) in zip(choices, valid_choices)):
+                    cfname_table[choices] = cfname
+            except TypeError:
+                cfname = cfdec.fnget(*choices)
+        else:
+            cfname = cfname_nochoice
+        cmss = self._cmemsubsets_parsed_
+        if not cmss.cfunc_is_callable(cfname):
+            raise ValueError(
+                'C function "%s" cannot be executed. Check flags %s.' %
+                (cfname, cmss.getall()))
+        cfunc = self._cfunc_loaded_[cfname]
+        # get c-function arguments
+        cargs = list(vals[:ncargs])
+        for (i, (isattr, default)) in enumerate(cdefaults):
+            if cargs[i] is _NOVALUE:
+                if isattr is None:
+                    raise KeyError(default)
+                elif isattr:
+                    val = getattr(self, default, _NOVALUE)
+                    cargs[i] = eval(default) if val is _NOVALUE else val
+                else:
+                    cargs[i] = default
+        # check arguments validity
+        for (i, idx, aname, lower_val, lower_name,
+             upper_plus, upper_name) in idxchecks:
+            val = cargs[i]
+            if val < lower_val:
+                raise ValueError(
+                    'index %s cannot be less than %s where value is %s=%d'
+                    % (idx, lower_name, aname, val))
+            upper_val = getattr(self, 'num_%s' % idx) + upper_plus
+            if val >= upper_val:
+                raise ValueError(
+                    'index %s cannot be larger than or equal to '
+                    '%s=%d where value is %s=%d'
+                    % (idx, upper_name, upper_val, aname, val))
+        return (cfname, cfunc, cargs)
+    bind.func_name = 'bind_%s' % fname
+    bind.idxchecks = idxchecks
+    return bind
+
+
+def cfunc_error(self, cfname, rcode):
+    """Get exception to be raised when C function returns non-zero `rcode`"""
+    if rcode in self._cerrors_:
+        return self._cerrors_[rcode]
+    else:
+        return RuntimeError('c-function %s() terminates with code %d'
+                            % (cfname, rcode))
+
+
+_timer = getattr(time, 'perf_counter', time.time)
+
+
+class CFuncStats(object):
+
+    """
+    Call statistics of a C function (see `MetaSimObject.cstats`)
+
+    Times are in seconds.  `python` is the time spent in the Python
+    wrapper (binding arguments and getting the returned value) and
+    `c` is the time spent in the ctypes call.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.calls = 0
+            self.total = 0.0
+            self.max = 0.0
+            self.c = 0.0
+            self.errors = {}
+
+    def add(self, total, c, rcode):
+        with self._lock:
+            self.calls += 1
+            self.total += total
+            self.c += c
+            if total > self.max:
+                self.max = total
+            if rcode != 0:
+                self.errors[rcode] = self.errors.get(rcode, 0) + 1
+
+    def asdict(self):
+        with self._lock:
+            return dict(calls=self.calls, total=self.total, max=self.max,
+                        python=self.total - self.c, c=self.c,
+                        errors=dict(self.errors))
+
+
+def gene_cfpywrap(attrs, cfdec, stats=None):
+    """
+    Generate python function given an object parsed by `cfuncs.cfdec_parse`
+
+    Arguments are bound by a binder specialized for `cfdec` (see
+    `gene_cfbinder`), which behaves as `gene_cfpywrap_generic`.
+    If `stats` (a `CFuncStats` instance) is given, calls which reach
+    the C function are timed and recorded in it.
+    """
+    bind = attrs['_cfbinders_'][cfdec.fname]
+    ret = cfdec.ret
+
+    if stats is None:
+        def cfpywrap(self, *args, **kwds):
+            (cfname, cfunc, cargs) = bind(self, args, kwds)
+            rcode = cfunc(self._struct_p_, *cargs)
+            if rcode == 0:
+                if ret:
+                    return getattr(self, ret)
+                else:
+                    return
+            else:
+                raise cfunc_error(self, cfname, rcode)
+    else:
+        add = stats.add
+
+        def cfpywrap(self, *args, **kwds):
+            t0 = _timer()
+            (cfname, cfunc, cargs) = bind(self, args, kwds)
+            t1 = _timer()
+            rcode = cfunc(self._struct_p_, *cargs)
+            t2 = _timer()
+            if rcode == 0:
+                value = getattr(self, ret) if ret else None
+                add(_timer() - t0, t2 - t1, rcode)
+                return value
+            else:
+                error = cfunc_error(self, cfname, rcode)
+                add(_timer() - t0, t2 - t1, rcode)
+                raise error
+    cfpywrap.func_name = cfdec.fname
+    # wrap it if there is wrap function
+    wrap_name = '_cwrap_%s' % cfdec.fname
+    if wrap_name in attrs:
+        cfpywrap = attrs[wrap_name](cfpywrap)
+    return cfpywrap
+
+
+class _AwaitableCall(object):
+
+    """
+    Run `func` in `executor` when awaited, like a coroutine does
+    """
+
+    def __init__(self, executor, func):
+        self.executor = executor
+        self.func = func
+
+    def __await__(self):
+        loop = getattr(asyncio, 'get_running_loop', asyncio.get_event_loop)()
+        return loop.run_in_executor(self.executor, self.func).__await__()
+
+
+def gene_cfpywrap_async(fname):
+    """
+    Generate awaitable twin of the method `fname` (see `_cexecutor_`)
+    """
+    def acfpywrap(self, *args, **kwds):
+        method = getattr(self, fname)
+        return _AwaitableCall(
+            self._cexecutor_, functools.partial(method, *args, **kwds))
+    acfpywrap.func_name = 'a' + fname
+    acfpywrap.__doc__ = (
+        'Awaitable version of :meth:`{0}`: ``await obj.a{0}(...)``'
+        .format(fname))
+    return acfpywrap
+
+
 def gene_array_alias(array_names, sep="_"):
     """
     Generate `array_alias` for parsing "array alias" such as "a_1_2"
@@ -351,6 +753,37 @@ def default_of_cmembers(cmems_parsed_list):
     return (cmems_default_scalar, cmems_default_array)
 
 
+def cfunc_declarations(cfuncs_parsed):
+    """
+    Map names of all C functions (choice combinations) to declarations
+    """
+    declarations = {}
+    for parsed in cfuncs_parsed.values():
+        for args in choice_combinations(parsed):
+            declarations[parsed.fnget(*args)] = parsed
+    return declarations
+
+
+def parse_spec(cmembers, cfuncs, cmemsubsets):
+    """
+    Parse class specification which does not depend on C library
+
+    Returned dict can be cached by `speccache`.
+    """
+    cfuncs_parsed = parse_cfuncs(cfuncs)
+    (cmems_parsed, cmems_parsed_list, idxset) = parse_cmembers(cmembers)
+    declarations = cfunc_declarations(cfuncs_parsed)
+    return dict(
+        cfuncs_parsed=cfuncs_parsed,
+        cmems_parsed=cmems_parsed,
+        cmems_parsed_list=cmems_parsed_list,
+        idxset=idxset,
+        cfunc_declarations=declarations,
+        cmemsubsets_parsed=CMemSubSets(
+            cmemsubsets, set(declarations), set(cmems_parsed)),
+        )
+
+
 def get_struct_class(cmems_parsed_list, cstructname):
     fields = []
     for parsed in cmems_parsed_list:
@@ -378,25 +811,78 @@ def array_alias_from_cmems_parsed(cmems_parsed):
     return staticmethod(array_alias)
 
 
-def load_cfunc(cdll, cfuncs_parsed, struct_type_p, cfuncprefix, idxset):
-    cfunc_loaded = {}
+class CFuncLoader(dict):
+
+    """
+    Dict of C functions which loads each C function on first access
 
-    def get_arg_ct(ag):
-        if ag['aname'] in idxset:
+    Key is the name of C function (without `cfuncprefix`) and value
+    is the ctypes function object.  Only the names in `declarations`
+    (see `cfunc_declarations`) can be loaded.  KeyError is raised for
+    the other names.
+
+    """
+
+    def __init__(self, cdll, declarations, struct_type_p, cfuncprefix,
+                 idxset):
+        super(CFuncLoader, self).__init__()
+        self._cdll = cdll
+        self._struct_type_p = struct_type_p
+        self._cfuncprefix = cfuncprefix
+        self._idxset = idxset
+        self.declarations = declarations
+
+    def _get_arg_ct(self, ag):
+        if ag['aname'] in self._idxset:
             return c_int
-        elif ag['cdt'] in idxset:
+        elif ag['cdt'] in self._idxset:
             return c_int
         else:
             return CDT2CTYPE[ag['cdt']]
 
-    for (fname, parsed) in cfuncs_parsed.items():
-        for args in choice_combinations(parsed):
-            cfname = parsed.fnget(*args)
-            cf = cdll[cfuncprefix + cfname]
-            cf.restype = c_int
-            cf.argtypes = (
-                [struct_type_p] + list(map(get_arg_ct, parsed.args)))
-            cfunc_loaded[cfname] = cf
+    def __missing__(self, cfname):
+        if cfname not in self.declarations:
+            raise KeyError(cfname)
+        parsed = self.declarations[cfname]
+        cf = self._cdll[self._cfuncprefix + cfname]
+        cf.restype = c_int
+        cf.argtypes = (
+            [self._struct_type_p] + list(map(self._get_arg_ct, parsed.args)))
+        self[cfname] = cf
+        return cf
+
+
+class CFFIFuncLoader(CFuncLoader):
+
+    """
+    `CFuncLoader` for the cffi backend
+
+    `cdll` is a `railgun.cffibackend.CFFILibrary` which already knows
+    the prototypes, so `struct_type_p` is not used.
+
+    """
+
+    def __missing__(self, cfname):
+        if cfname not in self.declarations:
+            raise KeyError(cfname)
+        cf = self._cdll.function(self._cfuncprefix + cfname)
+        self[cfname] = cf
+        return cf
+
+
+CBACKENDS = dict(ctypes=CFuncLoader, cffi=CFFIFuncLoader)
+
+
+def load_cfunc(cdll, cfuncs_parsed, struct_type_p, cfuncprefix, idxset,
+               declarations=None, loader=CFuncLoader):
+    if declarations is None:
+        declarations = cfunc_declarations(cfuncs_parsed)
+    cfunc_loaded = loader(
+        cdll, declarations, struct_type_p, cfuncprefix, idxset)
+    # Load only the default choice of each declaration now to detect
+    # wrong library or prefix early.  Others are loaded on demand.
+    for parsed in cfuncs_parsed.values():
+        cfunc_loaded[parsed.fnget(*[c['choices'][0] for c in parsed.choset])]
     return cfunc_loaded
 
 
@@ -434,6 +920,8 @@ class MetaSimObject(type):
 
     Attributes to be set
     --------------------
+    _cfuncs_parsed_ : dict
+        Key: name of C function; Value: object parsed by `cfuncs.cfdec_parse`
     _cmems_parsed_ : dict
         Key: name of C member; Value: object parsed by `cdata.cddec_parse`
     _cmems_default_scalar_ : dict
@@ -448,26 +936,44 @@ class MetaSimObject(type):
         Subclass of `ctypes.Structure` generated from `_cmembers_`
     _struct_type_p_ : ctypes obejct
         Pointer type of _struct_type_
+    _struct_pointer_ : function
+        Make the pointer passed to C functions (`_struct_p_`) from
+        the struct; depends on `_cbackend_`
     _cdll_ : ctypes object
         Loaded C library
-    _cfunc_loaded_ : dict
+        (`railgun.cffibackend.CFFILibrary` for the cffi backend)
+    _cfunc_loaded_ : CFuncLoader
         Loaded C functions.
         Key: Name of C function (without `_cfuncprefix_`);
-        Value: ctypes object
+        Value: ctypes (or cffi) object.
+        C functions are loaded when they are accessed first.
     _cmemsubsets_parsed_ : CMemSubSets
         An instance of CMemSubSets generated from `_cmemsubsets_`
+    _cfbinders_ : dict
+        Argument binders generated by `gene_cfbinder`.
+        Key: name of C function; Value: binder
+    _cstats_data_ : dict
+        Key: name of C function; Value: `CFuncStats`
 
     Additionally, C member and C function will be added as attributes.
+    For each C function `FNAME`, its awaitable version `aFNAME` is
+    also added (Python 3 only; see `SimObject._cexecutor_`).
+
+    These attributes are set when the class is *finalized*.  Unless
+    `_clazy_` is False, it happens when the class is instantiated or
+    when one of these attributes is accessed for the first time,
+    rather than when the class is defined.  `_cfinalized_` in the
+    class dict is True after the finalization.
 
     """
 
     def __new__(cls, clsname, bases, attrs):
         normal = super(MetaSimObject, cls).__new__(cls, clsname, bases, attrs)
         try:
-            clibdir = normal._clibdir_
-            clibname = normal._clibname_
-            cmembers = normal._cmembers_
-            cfuncs = normal._cfuncs_
+            normal._clibdir_
+            normal._clibname_
+            normal._cmembers_
+            normal._cfuncs_
         except AttributeError:
             # Required attributes are not set.  It is not possible to
             # setup C wrappers.  So, do not process anything at this
@@ -475,10 +981,13 @@ class MetaSimObject(type):
             return normal
 
         mandatory_attrs = ['_clibdir_', '_clibname_', '_cmembers_', '_cfuncs_']
-        if (all(name not in attrs for name in  mandatory_attrs) and
-            hasattr(normal, 'cinfo')):
+        # changing the backend needs C wrappers of its own, too:
+        if (all(name not in attrs for name in
+                mandatory_attrs + ['_cbackend_']) and
+            any('_cfinalized_' in vars(base) for base in normal.__mro__[1:])):
             # All required attributes already exist in base classes.
-            # Therefore, C wrappers are already ready.  There is
+            # Therefore, C wrappers are already ready (or will be
+            # ready when the base class is finalized).  There is
             # nothing to do other than the normal inheritance.
             return normal
         # Otherwise, (1) at least one of the mandatory attribute is
@@ -489,61 +998,219 @@ class MetaSimObject(type):
         #        enough, unless new functions are added in the current
         #        `_cfuncs_`.
 
-        cstructname = getattr(normal, '_cstructname_', clsname)
-        cfuncprefix = getattr(normal, '_cfuncprefix_', cstructname + CJOINSTR)
-        cmemsubsets = getattr(normal, '_cmemsubsets_', None)
-
-        ## parse _cfuncs_
-        cfuncs_parsed = parse_cfuncs(cfuncs)
-        ## parse _cmembers_
-        (cmems_parsed, cmems_parsed_list, idxset) = parse_cmembers(cmembers)
-        (cmems_default_scalar,
-         cmems_default_array) = default_of_cmembers(cmems_parsed_list)
-
-        attrs.update(
-            _cmems_parsed_=cmems_parsed,
-            _cmems_default_scalar_=cmems_default_scalar,
-            _cmems_default_array_=cmems_default_array,
-            _idxset_=idxset,
-            array_alias=array_alias_from_cmems_parsed(cmems_parsed),
-            cinfo=CInfo(cmems_parsed_list, idxset),
-            )
-        # FIXME: most of code in MetaSimObject.__new__ and top level
-        #        functions of this module must go into CInfo.
-
-        ## set _struct_type_ and _struct_type_p_
-        StructClass = get_struct_class(cmems_parsed_list, cstructname)
-        struct_type_p = POINTER(StructClass)
-        attrs.update(_struct_type_=StructClass, _struct_type_p_=struct_type_p)
-
-        ## set getter/setter
-        for (vname, parsed) in cmems_parsed.items():
-            if parsed.valtype == 'array':
-                attrs[vname] = _gene_prop_array(vname)
-            elif parsed.valtype == 'scalar':
-                attrs[vname] = _gene_prop_scalar(vname)
-            elif parsed.valtype == 'object':
-                attrs[vname] = _gene_prop_object(vname)
-            else:
-                ValueError('valtype "%s" is not recognized' % parsed.valtype)
-
-        ## load c-functions
-        cdll = numpy.ctypeslib.load_library(clibname, clibdir)
-        cfunc_loaded = load_cfunc(cdll, cfuncs_parsed, struct_type_p,
-                                  cfuncprefix, idxset)
-        attrs.update(
-            _cdll_=cdll,
-            _cfunc_loaded_=cfunc_loaded,
-            _cmemsubsets_parsed_=CMemSubSets(
-                cmemsubsets, set(cfunc_loaded), set(cmems_parsed)),
-            )
-        funcattrs = {}
-        for (fname, parsed) in cfuncs_parsed.items():
-            funcattrs[fname] = gene_cfpywrap(attrs, parsed)
-        cbase = type("DummyCBase", (object,), funcattrs)
-        bases = bases + (cbase,)
-
-        return super(MetaSimObject, cls).__new__(cls, clsname, bases, attrs)
+        # C functions are added to DummyCBase by `_finalize_class`.
+        cbase = type("DummyCBase", (object,), {})
+        attrs['_cfinalized_'] = False
+        simclass = super(MetaSimObject, cls).__new__(
+            cls, clsname, bases + (cbase,), attrs)
+        if not simclass._clazy_:
+            simclass._cfinalize_()
+        return simclass
+
+    def __getattr__(cls, name):
+        # Called only when `name` is not found.  It may be set when
+        # the class is finalized.
+        if name.startswith('__'):
+            raise AttributeError(name)
+        _finalize_pending(cls)
+        return type.__getattribute__(cls, name)
+
+    def _cfinalize_(cls):
+        """
+        Load C library and setup C wrappers now (see `SimObject._clazy_`)
+        """
+        _finalize_pending(cls)
+        return cls
+
+    def cstats(cls, reset=False, enable=None):
+        """
+        Call statistics of the C functions (see `SimObject._cstats_`)
+
+        Returns a dict whose key is the name of C function and value
+        is a dict with the following keys: ``calls`` (number of calls
+        which reached the C function), ``total`` and ``max`` (wall
+        time of a call in seconds), ``python`` and ``c`` (total time
+        spent in the Python wrapper and in the C function) and
+        ``errors`` (dict from non-zero return code to its count).
+
+        If `reset` is True, the counters are cleared after taking
+        the statistics.  If `enable` is True or False, the
+        instrumentation is turned on or off for the following calls.
+        Statistics are shared by the subclasses which do not
+        re-declare the C library.
+
+        """
+        _finalize_pending(cls)
+        owner = _cwrapper_owner(cls)
+        stats = owner._cstats_data_
+        result = dict((k, v.asdict()) for (k, v) in stats.items())
+        if reset:
+            for v in stats.values():
+                v.reset()
+        if enable is not None and bool(enable) != bool(owner._cstats_):
+            with _finalize_lock:
+                owner._cstats_ = bool(enable)
+                _set_cwrappers(owner)
+        return result
+
+
+# Serialize class finalization (it may run in threads of worker pool):
+_finalize_lock = threading.RLock()
+
+
+def _finalize_pending(cls):
+    """
+    Finalize `cls` and its base classes if not yet
+
+    `_cfinalized_` in the class dict is False if the class needs
+    finalization, None while finalizing and True when finalized.
+    """
+    if all(vars(c).get('_cfinalized_', True) is True for c in cls.__mro__):
+        return
+    with _finalize_lock:
+        for c in reversed(cls.__mro__):
+            if vars(c).get('_cfinalized_') is False:
+                c._cfinalized_ = None
+                try:
+                    _finalize_class(c)
+                except BaseException:
+                    c._cfinalized_ = False
+                    raise
+                c._cfinalized_ = True
+
+
+def _cwrapper_owner(cls):
+    """Class (`cls` or its base) whose `DummyCBase` holds the C wrappers"""
+    for c in cls.__mro__:
+        if '_cfinalized_' in vars(c):
+            return c
+
+
+def _set_cwrappers(cls):
+    """
+    (Re)generate Python wrappers of C functions and add to `DummyCBase`
+    """
+    attrs = vars(cls)
+    stats = cls._cstats_data_ if cls._cstats_ else {}
+    cbase = cls.__bases__[-1]
+    for (fname, parsed) in cls._cfuncs_parsed_.items():
+        setattr(cbase, fname,
+                gene_cfpywrap(attrs, parsed, stats.get(fname)))
+
+
+def _finalize_class(cls):
+    """
+    Parse declarations, load C library and setup C wrappers of `cls`
+    """
+    cstructname = getattr(cls, '_cstructname_', cls.__name__)
+    cfuncprefix = getattr(cls, '_cfuncprefix_', cstructname + CJOINSTR)
+    cmemsubsets = getattr(cls, '_cmemsubsets_', None)
+    attrs = dict(vars(cls))
+
+    ## parse _cfuncs_, _cmembers_ and _cmemsubsets_ (or load from cache)
+    spec = speccache.cached(
+        parse_spec, cls._cmembers_, cls._cfuncs_, cmemsubsets)
+    cfuncs_parsed = spec['cfuncs_parsed']
+    cmems_parsed = spec['cmems_parsed']
+    cmems_parsed_list = spec['cmems_parsed_list']
+    idxset = spec['idxset']
+    (cmems_default_scalar,
+     cmems_default_array) = default_of_cmembers(cmems_parsed_list)
+
+    attrs.update(
+        _cfuncs_parsed_=cfuncs_parsed,
+        _cmems_parsed_=cmems_parsed,
+        _cmems_default_scalar_=cmems_default_scalar,
+        _cmems_default_array_=cmems_default_array,
+        _idxset_=idxset,
+        array_alias=array_alias_from_cmems_parsed(cmems_parsed),
+        cinfo=CInfo(cmems_parsed_list, idxset),
+        )
+    # FIXME: most of code in _finalize_class and top level
+    #        functions of this module must go into CInfo.
+
+    ## set _struct_type_ and _struct_type_p_
+    StructClass = get_struct_class(cmems_parsed_list, cstructname)
+    struct_type_p = POINTER(StructClass)
+    attrs.update(_struct_type_=StructClass, _struct_type_p_=struct_type_p)
+
+    ## set getter/setter
+    for (vname, parsed) in cmems_parsed.items():
+        if parsed.valtype == 'array':
+            attrs[vname] = _gene_prop_array(vname)
+        elif parsed.valtype == 'scalar':
+            attrs[vname] = _gene_prop_scalar(vname)
+        elif parsed.valtype == 'object':
+            attrs[vname] = _gene_prop_object(vname)
+        else:
+            ValueError('valtype "%s" is not recognized' % parsed.valtype)
+
+    ## load c-functions
+    cbackend = cls._cbackend_
+    if cbackend not in CBACKENDS:
+        raise ValueError('_cbackend_ must be one of %s (got %r)'
+                         % (sorted(CBACKENDS), cbackend))
+    cdll = numpy.ctypeslib.load_library(cls._clibname_, cls._clibdir_)
+    if cbackend == 'cffi':
+        cdll = cffibackend.CFFILibrary(
+            cdll._name, cstructname, cmems_parsed_list, StructClass,
+            cfuncprefix, spec['cfunc_declarations'], idxset)
+        struct_pointer = cdll.pointer
+    else:
+        struct_pointer = pointer
+    cfunc_loaded = load_cfunc(cdll, cfuncs_parsed, struct_type_p,
+                              cfuncprefix, idxset, spec['cfunc_declarations'],
+                              CBACKENDS[cbackend])
+    attrs.update(
+        _cdll_=cdll,
+        _struct_pointer_=staticmethod(struct_pointer),
+        _cfunc_loaded_=cfunc_loaded,
+        _cmemsubsets_parsed_=spec['cmemsubsets_parsed'],
+        )
+    attrs.update(_cfbinders_=dict(
+        (fname, gene_cfbinder(parsed, idxset))
+        for (fname, parsed) in cfuncs_parsed.items()))
+    attrs.update(_cstats_data_=dict(
+        (fname, CFuncStats()) for fname in cfuncs_parsed))
+    funcattrs = {}
+    if asyncio is not None:
+        for fname in cfuncs_parsed:
+            aname = 'a' + fname
+            if aname not in cfuncs_parsed and aname not in cmems_parsed:
+                funcattrs[aname] = gene_cfpywrap_async(fname)
+
+    for (key, val) in attrs.items():
+        if key not in vars(cls) or vars(cls)[key] is not val:
+            setattr(cls, key, val)
+    cbase = cls.__bases__[-1]
+    for (fname, func) in funcattrs.items():
+        setattr(cbase, fname, func)
+    _set_cwrappers(cls)
+
+
+def _declared_attr(cls, name, default):
+    """Like `getattr` but does not finalize `cls` if `name` is missing"""
+    for c in cls.__mro__:
+        if name in vars(c):
+            return vars(c)[name]
+    return default
+
+
+def _class_path(cls):
+    """Importable name of `cls` (e.g., 'module.Class')"""
+    return '%s.%s' % (cls.__module__, cls.__name__)
+
+
+def _memory_summary(cmss, members, struct):
+    """Add totals to the per-member report (see `SimObject.memory_report`)"""
+    for rep in members.values():
+        rep.setdefault('total', rep['data'] + rep['table'])
+    subsets = {}
+    for (name, mfd) in cmss._cmss_.items():
+        subsets[name] = sum(members[k]['total'] for k in mfd['cmems']
+                            if k in members)
+    total = struct + sum(rep['total'] for rep in members.values())
+    return dict(members=members, struct=struct, subsets=subsets, total=total)
 
 
 class CInfo(object):
@@ -615,6 +1282,42 @@ class SimObject(six.with_metaclass(MetaSimObject)):
 
     _cerrors_ = {}
 
+    # Map from array C member name to .npy file path (see `_alloc_carray`):
+    _cmemmap_ = {}
+
+    # Capacity growth factor for ``reallocate(_preserve_=True)``:
+    _cgrowth_ = 2
+
+    # Alignment in bytes of array C members (int or dict of int):
+    _calign_ = None
+
+    # Pad the last axis of array C members to a multiple of this
+    # number of elements (int or dict; see `_carray_layout`):
+    _cpad_ = None
+
+    # Request transparent huge pages for array C members (bool or dict):
+    _chugepages_ = False
+
+    # Pre-fault pages of array C members at allocation; True or number
+    # of threads (or dict of them):
+    _cprefault_ = False
+
+    # If True, load C library when the class is used for the first time:
+    _clazy_ = True
+
+    # How C functions are called: 'ctypes' or 'cffi' (needs cffi):
+    _cbackend_ = 'ctypes'
+
+    # Executor used by awaitable C functions (None: default of the loop):
+    _cexecutor_ = None
+
+    # If True, record call statistics of C functions (see `cstats`):
+    _cstats_ = False
+
+    def __new__(cls, *args, **kwds):
+        _finalize_pending(cls)
+        return super(SimObject, cls).__new__(cls)
+
     def __init__(self, **kwds):
         """
         Allocate C members to construct `SimObject`
@@ -623,6 +1326,10 @@ class SimObject(six.with_metaclass(MetaSimObject)):
         ----------
         _calloc_ : bool, optional
             If True, use cstyle.CStyle to allocate memory (default: True).
+        _cmemmap_ : dict, optional
+            Map from array C member names to ``.npy`` file paths.
+            These arrays are memory-mapped files (see
+            :attr:`_cmemmap_`).  Updates the class attribute.
         _cmemsubsets_{FLAG_NAME} : bool, optional
             Set flag of `FLAG_NAME` which is defined by `_cmemsubsets_`
             attribute.
@@ -634,6 +1341,15 @@ class SimObject(six.with_metaclass(MetaSimObject)):
         if '_calloc_' in kwds:
             self._calloc_ = kwds['_calloc_']
             del kwds['_calloc_']
+        if '_cmemmap_' in kwds:
+            cmemmap = dict(self._cmemmap_)
+            cmemmap.update(kwds.pop('_cmemmap_'))
+            self._cmemmap_ = cmemmap
+        notarray = [k for k in self._cmemmap_ if not self._is_cmem_array(k)]
+        if notarray:
+            raise ValueError(
+                "_cmemmap_ keys must be array C members: %s"
+                % strset(notarray))
 
         # copy is needed otherwise self._cmemsubsets_parsed_ is shared by
         # all instance of SimObject
@@ -647,16 +1363,25 @@ class SimObject(six.with_metaclass(MetaSimObject)):
     def __setstate__(self, state):
         (attrs, kwds) = state
         self._cmemsubsets_parsed_ = attrs.pop('_cmemsubsets_parsed_')
-        self._set_all(**kwds)
+        # Copies are not backed by the files of the original
+        self._cmemmap_ = {}
+        # Arrays in `state` are newly created by the unpickler (or
+        # deepcopy), so use them as-is instead of copying them into
+        # newly allocated arrays.  With pickle protocol 5 and
+        # out-of-band buffers, nothing is copied.
+        carrays = dict((k, kwds.pop(k)) for k in list(kwds)
+                       if self._is_cmem_array(k))
+        self._set_all(_carrays_=carrays, **kwds)
         self.__dict__.update(attrs)
 
     def __getstate__(self):
         attrs = dict(
             (k, v) for (k, v) in self.__dict__.items()
-            if k not in ['_struct_', '_struct_p_', '_cdatastore_'])
+            if k not in ['_struct_', '_struct_p_', '_cdatastore_',
+                         '_cmemmap_'])
         kwds = {}
         kwds.update((k, v) for (k, v) in self._cdatastore_.items()
-                    if not k.startswith('CStyle:'))
+                    if ':' not in k)  # skip 'CStyle:*' etc.
         kwds.update(
             (k, getattr(self, k)) for (k, v) in self._cmems_parsed_.items()
             if v.valtype == 'scalar')
@@ -679,7 +1404,17 @@ class SimObject(six.with_metaclass(MetaSimObject)):
         return (name in self._cmems_parsed_ and
                 self._cmems_parsed_[name].valtype == 'object')
 
-    def _set_all(self, **kwds):
+    def _set_all(self, _carrays_=None, **kwds):
+        """
+        Allocate struct and arrays and then set C members
+
+        `_carrays_` is a dict of arrays to be used as the C members
+        as-is if possible (see `_carray_adoptable`).  Otherwise, they
+        are copied to newly allocated arrays.  Default values are not
+        set to them.
+        """
+        if _carrays_ is None:
+            _carrays_ = {}
         # decompose keyword arguments into its disjoint subsets
         kwds_scalar = subdict_by_filter(kwds, self._is_cmem_scalar, True)
         kwds_array = subdict_by_filter(kwds, self._is_cmem_array, True)
@@ -690,7 +1425,7 @@ class SimObject(six.with_metaclass(MetaSimObject)):
                 "undefined keyword arguments: %s" % kwds)
         # allocate struct
         self._struct_ = self._struct_type_()
-        self._struct_p_ = pointer(self._struct_)
+        self._struct_p_ = self._struct_pointer_(self._struct_)
         # set scalar variables including num_*
         scalarvals = dict_override(
             self._cmems_default_scalar_, kwds_scalar, addkeys=True)
@@ -704,15 +1439,21 @@ class SimObject(six.with_metaclass(MetaSimObject)):
                                  if k not in numkeyset)
         self.__set_num(**nums)
         self.setv(**nonnum_scalarvals)
+        # reuse contents of the existing memory-mapped files
+        _carrays_ = dict(self._open_cmemmap(_carrays_), **_carrays_)
         # allocate C array data and set the defaults
-        self._set_cdata()
         cmems_default_array = self._cmems_default_array_
-        array_allocated = filter(  # remove if not allocated
-            self._cmemsubsets_parsed_.cmem_need_alloc, cmems_default_array)
+        array_allocated = [  # remove if not allocated or given
+            k for k in cmems_default_array
+            if self._cmemsubsets_parsed_.cmem_need_alloc(k) and
+            k not in _carrays_]
         cmems_default_array_allocated = dict((k, cmems_default_array[k])
                                              for k in array_allocated)
-        self.setv(**dict_override(
-            cmems_default_array_allocated, kwds_array, addkeys=True))
+        arrayvals = dict_override(
+            cmems_default_array_allocated, kwds_array, addkeys=True)
+        # arrays in `arrayvals` are filled below; no need to zero-fill
+        self._set_cdata(_carrays_, set(arrayvals))
+        self.setv(**arrayvals)
         self.setv(**kwds_array_alias)
         self.setv(**kwds_object)
 
@@ -732,6 +1473,64 @@ class SimObject(six.with_metaclass(MetaSimObject)):
             else:
                 setattr(self, key, val)
 
+    def bind(self, **kwds):
+        """
+        Use given arrays as array C members without copying them
+
+        ``obj.bind(x=arr)`` makes ``obj.x`` *be* `arr`: the C struct
+        points to the memory of `arr`, so that changes made by C
+        functions are visible through `arr` and vice versa.  This is
+        useful to share an array between simulators, e.g., to use
+        the output of a simulator as the input of another one::
+
+            sim2.bind(x_input=sim1.x_output)
+
+        Arrays must be writeable, aligned (to `_calign_` bytes if
+        given), C-contiguous and have the same dtype and shape as the
+        C member.  Members padded by `_cpad_` cannot be bound.  For
+        members having a page policy (`_chugepages_` or
+        `_cprefault_`), arrays must be allocated by
+        :func:`railgun.pages.alloc_pages`.  ValueError is raised
+        otherwise, and no array is bound.  Note that the arrays are
+        replaced by new arrays by :meth:`reallocate`.
+
+        """
+        parsedlist = []
+        for (name, arr) in sorted(kwds.items()):
+            if not self._is_cmem_array(name):
+                raise ValueError('%s is not an array C member' % name)
+            if name not in self._cdatastore_:
+                raise ValueError('%s is not allocated' % name)
+            if name in self._cmemmap_:
+                raise ValueError('%s is backed by file %s'
+                                 % (name, self._cmemmap_[name]))
+            parsed = self._cmems_parsed_[name]
+            shape = self._carray_shape(parsed)
+            dtype = cdt_dtype(parsed.cdt)
+            if not isinstance(arr, numpy.ndarray):
+                raise ValueError('%s must be a numpy.ndarray' % name)
+            elif arr.dtype != dtype:
+                raise ValueError('dtype of %s must be %s (%s given)'
+                                 % (name, dtype, arr.dtype))
+            elif arr.shape != shape:
+                raise ValueError('shape of %s must be %s (%s given)'
+                                 % (name, shape, arr.shape))
+            (align, padded) = self._carray_layout(parsed, shape)
+            if padded != shape:
+                raise ValueError('%s is padded (see _cpad_)' % name)
+            elif (any(self._carray_pages(parsed)) and
+                  pages.buffer_of(arr) is None):
+                raise ValueError(
+                    '%s has a page policy (see _chugepages_ and _cprefault_)'
+                    '; use memory allocated by railgun.pages' % name)
+            elif not self._carray_adoptable(parsed, shape, arr):
+                raise ValueError(
+                    '%s must be writeable, aligned%s and C-contiguous'
+                    % (name, ' (to %d bytes)' % align if align else ''))
+            parsedlist.append((name, arr))
+        for (name, arr) in parsedlist:
+            self._replace_carray(name, arr)
+
     def getv(self, *args):
         """
         Get members obj.MEM by obj.getv('MEM')
@@ -771,21 +1570,558 @@ class SimObject(six.with_metaclass(MetaSimObject)):
         else:
             return nums
 
-    def _set_cdata(self):
+    def memory_report(self):
+        """
+        Break down the memory used by this object in bytes
+
+        Returns a dict with the following keys:
+
+        ``'members'``
+            Dict from the name of each allocated array C member to a
+            dict with keys ``'data'`` (size of the array),
+            ``'spare'`` (capacity reserved by
+            ``reallocate(..., _preserve_=True)`` and padding by
+            :attr:`_cpad_`), ``'table'`` (the
+            pointer table of a multi-dimensional array), ``'total'``
+            (sum of them) and ``'memmap'`` (True if the array is a
+            memory-mapped file; see :attr:`_cmemmap_`).
+        ``'struct'``
+            Size of the C struct.
+        ``'subsets'``
+            Dict from the name of each C member subset (see
+            :attr:`_cmemsubsets_`) to the total size of its members.
+            As a member can be in many subsets, they may overlap.
+        ``'total'``
+            Sum of all of the above (without double counting).
+
+        C member objects (:func:`railgun.cmem`) are not counted.
+
+        """
+        store = self._cdatastore_
+        members = {}
+        for (vname, parsed) in self._cmems_parsed_.items():
+            if parsed.valtype != 'array' or vname not in store:
+                continue
+            arr = store[vname]
+            buf = store.get('Capacity:%s' % vname, arr)
+            if 'CStyle:%s' % vname in store:
+                table = iliffe_table_nbytes(
+                    store['CStyle:%s' % vname].pyarray.shape)
+            elif 'ctype_getter:%s' % vname in store:
+                table = iliffe_table_nbytes(buf.shape)
+            else:
+                table = 0
+            (_, padded) = self._carray_layout(parsed, buf.shape)
+            nbytes = int(numpy.prod(padded, dtype=numpy.intp)) * buf.itemsize
+            members[vname] = dict(
+                data=arr.nbytes, spare=nbytes - arr.nbytes, table=table,
+                total=nbytes + table,
+                memmap=isinstance(arr, numpy.memmap))
+        return _memory_summary(self._cmemsubsets_parsed_, members,
+                               sizeof(self._struct_type_))
+
+    @classmethod
+    def estimate_nbytes(cls, **kwds):
+        """
+        Estimate the memory :meth:`memory_report` reports when created
+
+        Keyword arguments are the ones for the constructor.  Only
+        ``num_*`` and ``_cmemsubsets_*`` are used; defaults are
+        taken from :attr:`_cmembers_` and :attr:`_cmemsubsets_`.
+        Nothing is allocated.  Returns the ``'total'`` in bytes.
+
+        >>> from railgun import SimObject
+        >>> class Grid(SimObject):
+        ...     _clibname_ = 'libdummy'  # not loaded by this method
+        ...     _clibdir_ = '.'
+        ...     _cmembers_ = ['num_i', 'num_j = 3', 'double x[i][j]']
+        ...     _cfuncs_ = []
+        >>> nbytes = Grid.estimate_nbytes(num_i=1000)
+        >>> struct = 2 * sizeof(c_int) + sizeof(c_size_t)  # num_i, num_j, x
+        >>> nbytes == 1000 * 3 * 8 + 1000 * sizeof(c_size_t) + struct
+        True
+
+        """
+        spec = speccache.cached(
+            parse_spec, cls._cmembers_, cls._cfuncs_,
+            _declared_attr(cls, '_cmemsubsets_', None))
+        cmems_parsed = spec['cmems_parsed']
+        (defaults, _) = default_of_cmembers(spec['cmems_parsed_list'])
+        nums = dict_override(defaults, subdict_by_filter(
+            kwds, lambda k: k.startswith('num_')), addkeys=True)
+        num_lack = set('num_%s' % i for i in spec['idxset']) - set(nums)
+        if num_lack:
+            raise ValueError("%s are mandatory" % strset(num_lack))
+        cmss = spec['cmemsubsets_parsed'].copy()
+        cmss.set(**subdict_by_prefix(kwds, '_cmemsubsets_'))
+        cmemmap = _declared_attr(cls, '_cmemmap_', {})
+        calign = _declared_attr(cls, '_calign_', None)
+        cpad = _declared_attr(cls, '_cpad_', None)
+        members = {}
+        for (vname, parsed) in cmems_parsed.items():
+            if parsed.valtype == 'array' and cmss.cmem_need_alloc(vname):
+                shape = tuple(int(i) if i.isdigit() else nums['num_%s' % i]
+                              for i in parsed.idx)
+                if vname not in cmemmap:
+                    (_, shape) = carray_layout(parsed, shape, calign, cpad)
+                data = (int(numpy.prod(shape, dtype=numpy.intp)) *
+                        cdt_dtype(parsed.cdt).itemsize)
+                table = (0 if parsed.carrtype == 'flat' else
+                         iliffe_table_nbytes(shape))
+                members[vname] = dict(data=data, table=table)
+        struct_type = get_struct_class(
+            spec['cmems_parsed_list'],
+            _declared_attr(cls, '_cstructname_', cls.__name__))
+        return _memory_summary(cmss, members, sizeof(struct_type))['total']
+
+    def save(self, path, background=False, copy=True,
+             chunkbytes=checkpoint.CHUNKBYTES, threads=1):
+        """
+        Save C members to directory `path` as a checkpoint
+
+        Each allocated array C member is written to ``NAME.npy`` and
+        scalar C members (including ``num_*``) and the flags of
+        :attr:`_cmemsubsets_` to ``header.json``
+        (see :mod:`railgun.checkpoint`).  Arrays are written in chunks
+        of `chunkbytes` bytes by `threads` threads.  The checkpoint
+        can be loaded by :meth:`load`.
+
+        If `background` is true, the files are written by a new
+        thread and a :class:`concurrent.futures.Future` is returned,
+        so that the simulation can continue meanwhile::
+
+            future = sim.save('checkpoint', background=True)
+            sim.run()
+            future.result()  # wait and raise error if any
+
+        The arrays are copied before returning unless `copy` is
+        False, in which case they must not be changed until the
+        future is done.  Otherwise, None is returned after writing.
+
+        C member objects (:func:`railgun.cmem`) and other attributes
+        are not saved.
+
+        """
+        scalars = {}
+        for (vname, parsed) in self._cmems_parsed_.items():
+            if parsed.valtype == 'scalar':
+                val = getattr(self, vname)
+                if isinstance(val, bytes):  # char
+                    val = val.decode('latin-1')
+                scalars[vname] = val
+        nums = subdict_by_filter(scalars, lambda k: k.startswith('num_'),
+                                 remove_original=True)
+        header = {
+            'class': _class_path(self.__class__),
+            'nums': nums,
+            'scalars': scalars,
+            'cmemsubsets': self._cmemsubsets_parsed_.getall(),
+            }
+        arrays = dict((vname, self._cdatastore_[vname])
+                      for vname in self._cmems_parsed_
+                      if self._is_cmem_array(vname) and
+                      vname in self._cdatastore_)
+        if not background:
+            checkpoint.write(path, header, arrays, chunkbytes, threads)
+            return
+        if copy:
+            arrays = dict((k, v.copy()) for (k, v) in arrays.items())
+        return checkpoint.write_async(path, header, arrays, chunkbytes,
+                                      threads)
+
+    @classmethod
+    def load(cls, path, mmap_mode='c', strict=True):
+        """
+        Create an instance from the checkpoint written by :meth:`save`
+
+        Arrays are loaded by :func:`numpy.load` with `mmap_mode`.
+        With the default ``'c'`` (copy-on-write), the files are
+        memory-mapped and used as the C members without copying
+        (when they satisfy the conditions of :meth:`bind`); pages are
+        read on demand and changes are not written back to the
+        checkpoint.  Use ``'r+'`` to write changes to the files or
+        None to read everything into memory.
+
+        ValueError is raised if the checkpoint was saved by another
+        class, unless `strict` is False.  As in unpickling,
+        ``__init__`` is not called.
+
+        """
+        (header, arrays) = checkpoint.read(path, mmap_mode)
+        if strict and header.get('class') != _class_path(cls):
+            raise ValueError(
+                'checkpoint %s is saved by %s, not by %s (use strict=False '
+                'to load it anyway)'
+                % (path, header.get('class'), _class_path(cls)))
+        self = cls.__new__(cls)
+        self._cmemmap_ = {}
+        self._cmemsubsets_parsed_ = self._cmemsubsets_parsed_.copy()
+        self._cmemsubsets_parsed_.set(**header['cmemsubsets'])
+        scalars = dict(header['scalars'], **header['nums'])
+        for (vname, val) in scalars.items():
+            if (self._is_cmem_scalar(vname) and
+                    self._cmems_parsed_[vname].cdt == 'char'):
+                scalars[vname] = val.encode('latin-1')
+        for (vname, arr) in arrays.items():
+            if not self._is_cmem_array(vname):
+                raise ValueError('%s in %s is not an array C member'
+                                 % (vname, path))
+            parsed = self._cmems_parsed_[vname]
+            shape = tuple(int(i) if i.isdigit() else scalars['num_%s' % i]
+                          for i in parsed.idx)
+            dtype = cdt_dtype(parsed.cdt)
+            if arr.dtype != dtype or arr.shape != shape:
+                raise ValueError(
+                    'file for %s in %s has dtype %s and shape %s '
+                    '(%s and %s are needed)'
+                    % (vname, path, arr.dtype, arr.shape, dtype, shape))
+        self._set_all(_carrays_=arrays, **scalars)
+        return self
+
+    def call_many(self, fname, argseq, **kwds):
+        """
+        Call C function `fname` for each arguments in `argseq`
+
+        The following two lines have same effects, except that
+        `call_many` returns a list of *copies* of the returned
+        values (if the C function has a returned value) and is
+        much faster::
+
+            [obj.fname(*args, **kwds) for args in argseq]
+            obj.call_many('fname', argseq, **kwds)
+
+        `argseq` is an iterative of tuples or a 2D array with one
+        row per call.  Each tuple (row) is passed as positional
+        arguments and must have the same length.  Keyword
+        arguments `kwds` are shared by all calls.  Choices can only
+        be given by `kwds`, as all calls use the same C function;
+        ValueError is raised if rows are longer than the arguments
+        of the C function.
+        Index ranges are checked for all calls at once before calling
+        the C function.
+
+        Note that the C function is called directly: ``_cwrap_*``
+        functions and methods overriding the C function are not used.
+
+        """
+        bind = self._cfbinders_[fname]
+        if isinstance(argseq, numpy.ndarray):
+            if len(argseq) == 0:
+                return [] if self._cfuncs_parsed_[fname].ret else None
+            argarr = argseq.reshape((len(argseq), -1))
+            rows = [tuple(r) for r in argarr.tolist()]
+        else:
+            rows = [tuple(r) if isinstance(r, (tuple, list)) else (r,)
+                    for r in argseq]
+            argarr = None
+        if not rows:
+            return [] if self._cfuncs_parsed_[fname].ret else None
+        nargs = len(rows[0])
+        if any(len(r) != nargs for r in rows):
+            raise ValueError(
+                '%s() got argument tuples with different lengths' % fname)
+        ncargs = len(self._cfuncs_parsed_[fname].args)
+        if nargs > ncargs:
+            raise ValueError(
+                'call_many(%r, ...) got argument tuples of length %d but '
+                '%s() takes %d C argument(s); give choices as keyword '
+                'arguments' % (fname, nargs, fname, ncargs))
+        # bind the first call; the rest share everything but `rows`
+        (cfname, cfunc, cargs) = bind(self, rows[0], kwds)
+        tail = tuple(cargs[nargs:])
+        for (i, idx, aname, lower_val, lower_name,
+             upper_plus, upper_name) in bind.idxchecks:
+            if i >= nargs:
+                continue
+            if argarr is None:
+                col = numpy.array([r[i] for r in rows])
+            else:
+                col = argarr[:, i]
+            below = col < lower_val
+            if below.any():
+                raise ValueError(
+                    'index %s cannot be less than %s where value is %s=%d'
+                    % (idx, lower_name, aname, col[below][0]))
+            upper_val = getattr(self, 'num_%s' % idx) + upper_plus
+            above = col >= upper_val
+            if above.any():
+                raise ValueError(
+                    'index %s cannot be larger than or equal to '
+                    '%s=%d where value is %s=%d'
+                    % (idx, upper_name, upper_val, aname, col[above][0]))
+        # call c-function
+        ret = self._cfuncs_parsed_[fname].ret
+        copyret = ret and self._is_cmem_array(ret)
+        struct_p = self._struct_p_
+        results = []
+        for row in rows:
+            rcode = cfunc(struct_p, *(row + tail))
+            if rcode != 0:
+                raise cfunc_error(self, cfname, rcode)
+            if copyret:
+                results.append(getattr(self, ret).copy())
+            elif ret:
+                results.append(getattr(self, ret))
+        return results if ret else None
+
+    def stream(self, fname, chunks=None, members=None, carry=None,
+               copy=False, args=(), kwds=None):
+        """
+        Call C function `fname` repeatedly and yield members after each call
+
+        This is useful to run a simulation longer than what fits in
+        the memory, using arrays as a fixed-size window.  For example,
+        if ``run()`` computes ``x[s]`` from ``x[s - 1]`` for
+        ``s = 1, ..., num_s - 1``::
+
+            for x in obj.stream('run', members='x'):
+                process(x)  # x[0] of the 2nd chunk = x[-1] of the 1st
+
+        :arg int chunks:
+            Number of calls.  If None (default), it never stops.
+        :arg members:
+            Name (str) or a list of names of C members to be yielded.
+            A member is yielded as-is if a str is given, otherwise
+            a tuple of members are yielded.
+        :arg carry:
+            Names of array C members whose last element (along the
+            first axis) is moved to the first element before each call
+            except the first one.  As the first element is just a copy,
+            it is not included in the yielded arrays after the first
+            call.  Default is the array C members in `members`.
+        :arg bool copy:
+            If False (default), views of the arrays are yielded.  They
+            are overwritten by the next call.  Set it to True to get
+            copies instead.
+        :arg tuple args:
+        :arg dict kwds:
+            Arguments passed to the C function.
+
+        """
+        if kwds is None:
+            kwds = {}
+        if isinstance(members, six.string_types):
+            names = [members]
+        else:
+            names = list(members or [])
+        if carry is None:
+            carry = [m for m in names if self._is_cmem_array(m)]
+        method = getattr(self, fname)
+        i = 0
+        while chunks is None or i < chunks:
+            if i > 0:
+                for name in carry:
+                    arr = getattr(self, name)
+                    arr[0] = arr[-1]
+            method(*args, **kwds)
+            vals = []
+            for name in names:
+                val = getattr(self, name)
+                if i > 0 and name in carry:
+                    val = val[1:]
+                if copy and isinstance(val, numpy.ndarray):
+                    val = val.copy()
+                vals.append(val)
+            if isinstance(members, six.string_types):
+                yield vals[0]
+            else:
+                yield tuple(vals)
+            i += 1
+
+    def _set_cdata(self, carrays={}, nozeros=()):
+        """
+        Allocate array C members
+
+        Arrays in `carrays` are used as-is if possible.
+        Arrays whose name is in `nozeros` are not zero-filled.
+        """
         self._cdatastore_ = {}  # keep memory for arrays
         cmem_need_alloc = self._cmemsubsets_parsed_.cmem_need_alloc
         for (vname, parsed) in self._cmems_parsed_.items():
             if parsed.valtype == 'array' and cmem_need_alloc(vname):
-                self.__set_carray(parsed)
+                self.__set_carray(parsed, carrays.get(vname),
+                                  zeros=vname not in nozeros)
 
-    def __set_carray(self, parsed):
-        vname = parsed.vname
-        shape = tuple(
+    def _open_cmemmap(self, skip=()):
+        """
+        Open existing files of `_cmemmap_` as dict of `numpy.memmap`
+
+        Files for arrays in `skip` or not allocated are ignored.
+        ValueError is raised if dtype or shape of the file does not
+        match with the C member.
+        """
+        cmem_need_alloc = self._cmemsubsets_parsed_.cmem_need_alloc
+        carrays = {}
+        for (vname, path) in self._cmemmap_.items():
+            if (vname in skip or not cmem_need_alloc(vname) or
+                    not os.path.exists(path)):
+                continue
+            parsed = self._cmems_parsed_[vname]
+            shape = self._carray_shape(parsed)
+            dtype = cdt_dtype(parsed.cdt)
+            arr = numpy.load(path, mmap_mode='r+')
+            if arr.dtype != dtype or arr.shape != shape:
+                raise ValueError(
+                    'file %s for %s has dtype %s and shape %s '
+                    '(%s and %s are needed)'
+                    % (path, vname, arr.dtype, arr.shape, dtype, shape))
+            carrays[vname] = arr
+        return carrays
+
+    def _carray_shape(self, parsed):
+        """Get shape of array C member from current `num_*`"""
+        return tuple(
             int(i) if i.isdigit() else getattr(self, 'num_%s' % i)
             for i in parsed.idx)
-        dtype = CDT2DTYPE[parsed.cdt]
-        arr = numpy.zeros(shape, dtype=dtype)
+
+    def _carray_layout(self, parsed, shape):
+        """
+        Get ``(align, padded)`` for array C member `parsed` of `shape`
+
+        `align` is the alignment in bytes (0 if not requested) and
+        `padded` is the shape of the memory to be allocated, i.e.,
+        `shape` whose last axis is rounded up to a multiple of the
+        padding (see `_calign_` and `_cpad_`).  Memory-mapped members
+        are not aligned or padded.
+        """
+        if parsed.vname in self._cmemmap_:
+            return (0, shape)
+        return carray_layout(parsed, shape, self._calign_, self._cpad_)
+
+    def _carray_pages(self, parsed):
+        """
+        Get ``(hugepages, prefault)`` requested for array C member `parsed`
+
+        See `_chugepages_` and `_cprefault_`.  Memory-mapped members
+        are excluded.
+        """
+        vname = parsed.vname
+        if vname in self._cmemmap_:
+            return (False, 0)
+        return tuple(opt.get(vname, False) if isinstance(opt, dict) else opt
+                     for opt in [self._chugepages_, self._cprefault_])
+
+    def page_policy(self):
+        """
+        Page policy which took effect for each array C member
+
+        Returns a dict from the name of each allocated array C member
+        to a dict with keys ``'hugepages'`` (True if huge pages were
+        requested and the request was accepted by the OS) and
+        ``'prefault'`` (number of threads used to pre-fault the pages,
+        or 0).  See :attr:`_chugepages_` and :attr:`_cprefault_`.
+
+        Note that the kernel may still back the memory by normal pages
+        (e.g., when memory is fragmented); see ``AnonHugePages`` in
+        ``/proc/self/smaps``.
+
+        """
+        store = self._cdatastore_
+        return dict(
+            (vname, pages.policy_of(store['Capacity:%s' % vname]
+                                    if 'Capacity:%s' % vname in store
+                                    else store[vname]))
+            for (vname, parsed) in self._cmems_parsed_.items()
+            if parsed.valtype == 'array' and vname in store)
+
+    def _alloc_carray(self, parsed, shape, zeros=True):
+        """
+        Allocate a new array for C member
+
+        This is the only place where memory for array C members are
+        allocated.  Returned array must have the dtype corresponding
+        to ``parsed.cdt`` and be C-contiguous unless it is padded
+        (see `_carray_layout`).  If `zeros` is false, the array is not
+        initialized; use this only when the whole array is overwritten
+        right after.
+
+        Arrays listed in `_cmemmap_` are created as new ``.npy``
+        files mapped by `numpy.memmap`.
+        """
+        (align, padded) = self._carray_layout(parsed, shape)
+        (hugepages, prefault) = self._carray_pages(parsed)
+        if align or padded != shape or hugepages or prefault:
+            arr = alloc_aligned(padded, cdt_dtype(parsed.cdt), align, zeros,
+                                hugepages, prefault)
+            return arr[tuple(slice(0, n) for n in shape)]
+        if parsed.vname in self._cmemmap_:
+            path = self._cmemmap_[parsed.vname]
+            if os.path.exists(path):
+                # Unlink first so that arrays mapping the old file
+                # (e.g., before `reallocate`) remain valid.
+                os.remove(path)
+            # new file is filled with zeros by the OS
+            return numpy.lib.format.open_memmap(
+                path, mode='w+', dtype=cdt_dtype(parsed.cdt), shape=shape)
+        elif zeros:
+            return numpy.zeros(shape, dtype=cdt_dtype(parsed.cdt))
+        else:
+            return numpy.empty(shape, dtype=cdt_dtype(parsed.cdt))
+
+    def _replace_carray(self, vname, arr):
+        """
+        Use `arr` as C member `vname` without any check or copy
+        """
         self._cdatastore_[vname] = arr
+        self._cdatastore_.pop('Capacity:%s' % vname, None)
+        self.__set_pointer(self._cmems_parsed_[vname], arr)
+
+    def _set_struct(self, struct):
+        """
+        Move the C struct to `struct`, an instance of `_struct_type_`
+
+        This is used to put structs of many instances in one ctypes
+        array (see `railgun.simobjarray`).  Memory pointed by the
+        struct is kept by `_cdatastore_`, so the old struct can be
+        discarded.
+        """
+        memmove(addressof(struct), addressof(self._struct_),
+                sizeof(self._struct_type_))
+        self._struct_ = struct
+        self._struct_p_ = self._struct_pointer_(struct)
+
+    def _carray_adoptable(self, parsed, shape, arr):
+        """
+        True if `arr` can be used as C member `parsed` without copy
+        """
+        if parsed.vname in self._cmemmap_:
+            if not (isinstance(arr, numpy.memmap) and
+                    arr.filename == os.path.abspath(
+                        self._cmemmap_[parsed.vname])):
+                return False
+        (align, padded) = self._carray_layout(parsed, shape)
+        return (isinstance(arr, numpy.ndarray) and
+                arr.dtype == cdt_dtype(parsed.cdt) and
+                arr.shape == shape and
+                padded == shape and  # padding of `arr` is unknown
+                (not any(self._carray_pages(parsed)) or
+                 pages.buffer_of(arr) is not None) and
+                arr.ctypes.data % (align or 1) == 0 and
+                arr.flags.c_contiguous and
+                arr.flags.aligned and
+                arr.flags.writeable)
+
+    def __set_carray(self, parsed, arr=None, zeros=True):
+        vname = parsed.vname
+        shape = self._carray_shape(parsed)
+        if arr is None:
+            arr = self._alloc_carray(parsed, shape, zeros)
+        elif not self._carray_adoptable(parsed, shape, arr):
+            given = arr
+            arr = self._alloc_carray(parsed, shape, zeros=False)
+            arr[...] = given
+        self._replace_carray(vname, arr)
+
+    def __set_pointer(self, parsed, arr):
+        """
+        Point C member `parsed` to `arr` (or to its prefix along axis 0)
+
+        The pointer table of a multi-dimensional array is also valid
+        for any prefix ``arr[:n]``, which is used by `__grow_carray`.
+        """
+        vname = parsed.vname
+        self._cdatastore_.pop('CStyle:%s' % vname, None)
+        self._cdatastore_.pop('ctype_getter:%s' % vname, None)
         if parsed.carrtype == "flat":
             ptr = arr.ctypes.data_as(POINTER(CDT2CTYPE[parsed.cdt]))
         elif self._calloc_ and 1 < arr.ndim <= cstyle.MAXDIM:
@@ -796,8 +2132,49 @@ class SimObject(six.with_metaclass(MetaSimObject)):
                 POINTER_nth(CDT2CTYPE[parsed.cdt], parsed.ndim))
         else:
             ptr = ctype_getter(arr)
+            # keep the pointer table here rather than in the struct
+            # so that the struct can be moved (see `_set_struct`)
+            self._cdatastore_['ctype_getter:%s' % vname] = ptr
         setattr(self._struct_, vname, ptr)
 
+    def __grow_carray(self, parsed):
+        """
+        Resize array C member `parsed` keeping the overlapping region
+
+        Memory is over-allocated along the first axis by the factor
+        `_cgrowth_` and kept in ``_cdatastore_['Capacity:NAME']``.
+        The C member is a prefix of it.  Therefore, when only the
+        first axis changes and the capacity is enough, neither
+        memory nor pointer table is allocated.  New elements are
+        zero-filled.
+        """
+        vname = parsed.vname
+        shape = self._carray_shape(parsed)
+        old = self._cdatastore_[vname]
+        key = 'Capacity:%s' % vname
+        buf = self._cdatastore_.get(key, old)
+        if buf.shape[1:] == shape[1:] and shape[0] <= len(buf):
+            arr = buf[:shape[0]]
+            arr[len(old):] = 0
+            self._cdatastore_[vname] = arr
+            self._cdatastore_[key] = buf
+            return
+        if vname in self._cmemmap_:
+            capacity = shape[0]  # file must have the shape of the member
+        elif shape[0] > len(buf):
+            capacity = max(shape[0], int(len(buf) * self._cgrowth_))
+        elif key in self._cdatastore_:
+            capacity = len(buf)  # only other axes changed; keep capacity
+        else:
+            capacity = shape[0]
+        buf = self._alloc_carray(parsed, (capacity,) + shape[1:])
+        overlap = tuple(slice(0, min(m, n))
+                        for (m, n) in zip(old.shape, shape))
+        buf[overlap] = old[overlap]
+        self._cdatastore_[vname] = buf[:shape[0]]
+        self._cdatastore_[key] = buf
+        self.__set_pointer(parsed, buf)
+
     def _check_index_in_range(self, arg_val_list):
         """
         Raise ValueError if index 'i' is bigger than 0 and less than num_'i'
@@ -835,7 +2212,7 @@ class SimObject(six.with_metaclass(MetaSimObject)):
         for (key, val) in nums.items():
             setattr(self._struct_, 'num_{0}'.format(key), val)
 
-    def reallocate(self, **nums):
+    def reallocate(self, _preserve_=False, **nums):
         """
         Reallocate arrays consistently.
 
@@ -847,6 +2224,20 @@ class SimObject(six.with_metaclass(MetaSimObject)):
         >>> obj.num_j                                      # doctest: +SKIP
         20
 
+        By default, new arrays are zero-filled.  If `_preserve_` is
+        True, the overlapping region of the old and new arrays is
+        kept and the rest is zero-filled.  Furthermore, memory is
+        over-allocated along the first axis of each array (see
+        :attr:`_cgrowth_`), so that growing an array step by step
+        along its first axis costs O(1) amortized time::
+
+            for s in range(1, num_steps):
+                obj.reallocate(s=s + 1, _preserve_=True)
+                obj.step(s)  # C code writes to obj.x[s]
+
+        Arrays may be copied when they grow; do not keep references
+        to them across the calls.
+
         """
         indices = set(nums)
         invalid = indices - self.cinfo.indices
@@ -865,4 +2256,7 @@ class SimObject(six.with_metaclass(MetaSimObject)):
 
         self.__set_num(**nums)
         for parsed in arrays:
-            self.__set_carray(parsed)
+            if _preserve_:
+                self.__grow_carray(parsed)
+            else:
+                self.__set_carray(parsed)
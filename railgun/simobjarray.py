@@ -0,0 +1,176 @@
+"""
+Ensemble of `SimObject` instances sharing batched arrays
+"""
+
+import copy
+from ctypes import sizeof
+
+import numpy
+
+from railgun.simobj import alloc_aligned, cdt_dtype, cfunc_error
+
+
+class SimObjectArray(object):
+
+    """
+    Ensemble of `n` instances of `SimObject` subclass `cls`
+
+    Usage::
+
+        ens = SimObjectArray(YourSimObject, 10000, num_i=100, dt=0.01)
+        ens.x0 = numpy.random.randn(10000, 100)  # set all initial values
+        ens.run()                                # call C function for all
+        mean = ens.x.mean(axis=0)                # statistics over ensemble
+
+    Each array C member is allocated once, as an array with an extra
+    leading axis of length `n` (called "slab" here).  The structs of
+    the elements are stored in one ctypes array and their pointers
+    point into the slabs.  Accessing C members via this object
+    returns
+
+    - the slab of shape ``(n,) + shape`` for array C members, and
+    - the vector of length `n` which is a view of the structs for
+      scalar C members (see :attr:`scalars`).
+
+    Both are NumPy views, i.e., changing them changes the C members
+    of all elements without any gather/scatter.  Setting an attribute
+    (e.g., ``ens.dt = dts``) broadcasts the value.  C functions are
+    called for all elements by ``ens.FUNC_NAME(*args, **kwds)``.
+
+    Each element is an ordinary instance of `cls`, available via
+    ``ens[i]``.  All elements are initialized by ``cls(**kwds)``.
+    Do not call :meth:`.SimObject.reallocate` or
+    :meth:`.SimObject.bind` of the elements, as it detaches the
+    element from the slabs.
+
+    .. attribute:: scalars
+
+       Structured array of length `n` whose fields are the scalar
+       C members.  This is a view of the C structs.
+
+    .. attribute:: slabs
+
+       Dict of array C members with the leading batch axis.
+
+    .. attribute:: elements
+
+       List of the instances of `cls`.
+
+    """
+
+    def __init__(self, cls, n, **kwds):
+        template = cls(**kwds)
+        (attrs, state) = template.__getstate__()
+        slabs = {}
+        for (vname, parsed) in template._cmems_parsed_.items():
+            if parsed.valtype == 'array' and vname in state:
+                arr = state.pop(vname)
+                layout = template._carray_layout(parsed, arr.shape)
+                if layout != (0, arr.shape):
+                    raise ValueError(
+                        'SimObjectArray does not support _calign_ and '
+                        '_cpad_ (given for %s)' % vname)
+                (hugepages, prefault) = template._carray_pages(parsed)
+                if hugepages or prefault:
+                    slab = alloc_aligned((n,) + arr.shape, arr.dtype, 0,
+                                         False, hugepages, prefault)
+                else:
+                    slab = numpy.empty((n,) + arr.shape, dtype=arr.dtype)
+                slab[...] = arr
+                slabs[vname] = slab
+        struct_type = template._struct_type_
+        structs = (struct_type * n)()
+        elements = []
+        cmss = attrs.pop('_cmemsubsets_parsed_')
+        for i in range(n):
+            obj = cls.__new__(cls)
+            # C member objects and other attributes are not shared
+            if attrs or any(not numpy.isscalar(v) for v in state.values()):
+                (attrs_i, state_i) = copy.deepcopy((attrs, state))
+            else:
+                (attrs_i, state_i) = ({}, dict(state))
+            attrs_i['_cmemsubsets_parsed_'] = cmss_i = cmss.copy()
+            cmss_i.set(**cmss.getall())
+            state_i.update((k, v[i]) for (k, v) in slabs.items())
+            obj.__setstate__((attrs_i, state_i))
+            obj._set_struct(structs[i])
+            elements.append(obj)
+
+        scalar_names = [
+            vname for (vname, parsed) in template._cmems_parsed_.items()
+            if parsed.valtype == 'scalar']
+        dtype = numpy.dtype(dict(
+            names=scalar_names,
+            formats=[cdt_dtype(template._cmems_parsed_[k].cdt)
+                     for k in scalar_names],
+            offsets=[getattr(struct_type, k).offset for k in scalar_names],
+            itemsize=sizeof(struct_type)))
+
+        self.__dict__.update(
+            simclass=cls,
+            elements=elements,
+            slabs=slabs,
+            scalars=numpy.frombuffer(structs, dtype=dtype),
+            _structs=structs,
+            )
+
+    def __len__(self):
+        return len(self.elements)
+
+    def __getitem__(self, i):
+        return self.elements[i]
+
+    def __iter__(self):
+        return iter(self.elements)
+
+    def __getattr__(self, name):
+        # called only when `name` is not an attribute of this object
+        if 'scalars' not in self.__dict__:  # not initialized yet
+            raise AttributeError(name)
+        if name in self.slabs:
+            return self.slabs[name]
+        elif name in self.scalars.dtype.names:
+            return self.scalars[name]
+        elif name in self.simclass._cfuncs_parsed_:
+            return lambda *args, **kwds: self.call(name, *args, **kwds)
+        raise AttributeError(
+            "'{0}' object has no attribute '{1}'"
+            .format(self.__class__.__name__, name))
+
+    def __setattr__(self, name, value):
+        if 'scalars' not in self.__dict__:
+            object.__setattr__(self, name, value)
+        elif name in self.slabs:
+            self.slabs[name][...] = value
+        elif name in self.scalars.dtype.names:
+            if name.startswith('num_'):
+                raise AttributeError(
+                    'Attribute starts with `num_` cannot be changed.')
+            self.scalars[name] = value
+        else:
+            object.__setattr__(self, name, value)
+
+    def call(self, fname, *args, **kwds):
+        """
+        Call C function `fname` of all elements
+
+        Arguments are shared by all elements.  Defaults given by
+        C members are taken from each element.  Returns the slab or
+        a copy of the vector of the returned C member, or None.
+        Note that ``_cwrap_*`` functions and methods overriding the
+        C function are not used.
+
+        """
+        bind = self.simclass._cfbinders_[fname]
+        for obj in self.elements:
+            (cfname, cfunc, cargs) = bind(obj, args, kwds)
+            rcode = cfunc(obj._struct_p_, *cargs)
+            if rcode != 0:
+                raise cfunc_error(obj, cfname, rcode)
+        ret = self.simclass._cfuncs_parsed_[fname].ret
+        if ret in self.slabs:
+            return self.slabs[ret]
+        elif ret in self.scalars.dtype.names:
+            return self.scalars[ret].copy()
+        elif ret:
+            return [getattr(obj, ret) for obj in self.elements]
@@ -0,0 +1,113 @@
+"""
+On-disk cache of parsed `SimObject` class specifications
+
+Parsing `_cmembers_`, `_cfuncs_` and `_cmemsubsets_` (regular
+expressions, brace expansion and `eval` of defaults) runs every time
+a class is finalized.  For classes with hundreds of members, this can
+dominate the start up time of short-lived (e.g., worker) processes.
+
+Set the environment variable ``RAILGUN_SPEC_CACHE_DIR`` to a
+directory to store the parsed specifications there.  A file is keyed
+by the hash of the declarations, so that changing the declarations
+never loads a stale specification.  Classes declaring C member
+objects (:func:`railgun.cmem`) are not cached.
+
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import sys
+import tempfile
+
+import six
+
+CACHE_DIR_ENV = 'RAILGUN_SPEC_CACHE_DIR'
+
+# Bump this when the format of parsed specifications is changed:
+SPEC_FORMAT = 1
+
+
+def get_cache_dir():
+    """Cache directory or None if caching is disabled"""
+    return os.environ.get(CACHE_DIR_ENV) or None
+
+
+def spec_key(cmembers, cfuncs, cmemsubsets):
+    """
+    Hash of the declarations or None if they cannot be cached
+
+    >>> key = spec_key(['num_i', 'int a[i]'], ['f()'], None)
+    >>> key == spec_key(['num_i', 'int a[i]'], ['f()'], None)
+    True
+    >>> key == spec_key(['num_i', 'int a[i] = 1'], ['f()'], None)
+    False
+    >>> spec_key([object()], ['f()'], None) is None
+    True
+
+    """
+    decls = list(cmembers) + list(cfuncs)
+    if not all(isinstance(d, six.string_types) for d in decls):
+        return None
+    from railgun import __version__
+    try:
+        source = json.dumps(
+            [SPEC_FORMAT, __version__, list(sys.version_info[:2]),
+             list(cmembers), list(cfuncs), cmemsubsets],
+            sort_keys=True)
+    except TypeError:
+        return None
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+def load(cachedir, key):
+    """Load specification from `cachedir` or return None"""
+    path = os.path.join(cachedir, key + '.pickle')
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except Exception:  # missing, broken or incompatible file
+        return None
+
+
+def dump(cachedir, key, spec):
+    """Store specification atomically; errors are ignored"""
+    try:
+        if not os.path.isdir(cachedir):
+            os.makedirs(cachedir)
+        (fd, tmppath) = tempfile.mkstemp(dir=cachedir, suffix='.tmp')
+    except (OSError, IOError):
+        return
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(spec, f, protocol=pickle.HIGHEST_PROTOCOL)
+        _replace(tmppath, os.path.join(cachedir, key + '.pickle'))
+    except Exception:  # e.g., unpicklable defaults or disk full
+        try:
+            os.remove(tmppath)
+        except OSError:
+            pass
+
+
+_replace = getattr(os, 'replace', os.rename)  # os.replace: Python >= 3.3
+
+
+def cached(parse, cmembers, cfuncs, cmemsubsets):
+    """
+    Call ``parse(cmembers, cfuncs, cmemsubsets)`` or load its result
+
+    The result is loaded from (or stored to) the cache directory if
+    caching is enabled and the declarations can be cached.
+
+    """
+    cachedir = get_cache_dir()
+    key = None if cachedir is None else spec_key(
+        cmembers, cfuncs, cmemsubsets)
+    if key is None:
+        return parse(cmembers, cfuncs, cmemsubsets)
+    spec = load(cachedir, key)
+    if spec is None:
+        spec = parse(cmembers, cfuncs, cmemsubsets)
+        dump(cachedir, key, spec)
+    return spec
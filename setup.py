@@ -37,5 +37,9 @@ setup(
     install_requires=[
         'numpy',
         'six',
+        'futures; python_version < "3"',
     ],
+    extras_require={
+        'cffi': ['cffi'],
+    },
     )
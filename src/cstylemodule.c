@@ -3,7 +3,8 @@
 #include "structmember.h"
 #include <numpy/arrayobject.h>
 
-#define CStyle_MAXDIM 5
+/* Limited only by numpy */
+#define CStyle_MAXDIM NPY_MAXDIMS
 
 typedef struct cstyle_{
   PyObject_HEAD
@@ -13,106 +14,53 @@ typedef struct cstyle_{
 } CStyle;
 
 
+/*
+  Allocate Iliffe vector (pointer table) of N-dim array (N >= 2)
+
+  All levels of the table are allocated as one block: num0 pointers
+  to the second level first, then num0 * num1 pointers and so on.
+  The last level points to the rows of the array.  The addresses of
+  the rows are computed from the strides, so the array does not need
+  to be contiguous.
+*/
 static void **
-cstyle2d_alloc(PyObject* pyarray)
+cstyle_alloc(PyArrayObject* pyarray)
 {
-  int i, num0;
+  int k, nd = PyArray_NDIM(pyarray);
+  npy_intp *dims = PyArray_DIMS(pyarray);
+  npy_intp *strides = PyArray_STRIDES(pyarray);
+  npy_intp start[NPY_MAXDIMS], count[NPY_MAXDIMS], idx[NPY_MAXDIMS];
+  npy_intp m, total = 0;
   void **carray;
+  char *row;
 
-  num0 = PyArray_DIM(pyarray, 0);
-  carray = (void**) PyMem_Malloc(sizeof(void*) * num0);
-  if (carray == NULL){
-    return NULL;
+  for (k = 0; k < nd - 1; ++k){
+    count[k] = (k == 0) ? dims[0] : count[k - 1] * dims[k];
+    start[k] = total;
+    total += count[k];
   }
-  for (i = 0; i < num0; ++i){
-    carray[i] = PyArray_GETPTR2(pyarray, i, 0);
-  }
-  return carray;
-}
-
-
-static void ***
-cstyle3d_alloc(PyObject* pyarray)
-{
-  int i, j, num0, num1;
-  void ***carray, **ptr1;
-
-  num0 = PyArray_DIM(pyarray, 0);
-  num1 = PyArray_DIM(pyarray, 1);
-
-  carray = (void***) PyMem_Malloc(sizeof(void*) * (num0 * (1 + num1)));
+  carray = (void**) PyMem_Malloc(sizeof(void*) * (total > 0 ? total : 1));
   if (carray == NULL) return NULL;
-  ptr1 = (void**) (carray + num0);
 
-  for (i = 0; i < num0; ++i){
-    carray[i] = ptr1 + (i * num1);
-    for (j = 0; j < num1; ++j){
-      carray[i][j] = PyArray_GETPTR3(pyarray, i, j, 0);
+  /* pointers to the next level */
+  for (k = 0; k < nd - 2; ++k){
+    for (m = 0; m < count[k]; ++m){
+      carray[start[k] + m] = carray + start[k + 1] + m * dims[k + 1];
     }
   }
-  return carray;
-}
-
-
-static void ****
-cstyle4d_alloc(PyObject* pyarray)
-{
-  int i, j, k, num0, num1, num2;
-  void ****carray, ***ptr1, **ptr2;
 
-  num0 = PyArray_DIM(pyarray, 0);
-  num1 = PyArray_DIM(pyarray, 1);
-  num2 = PyArray_DIM(pyarray, 2);
-
-  carray = (void****)
-    PyMem_Malloc(sizeof(void*) * (num0 * (1 + num1 * (1 + num2))));
-  if (carray == NULL) return NULL;
-  ptr1 = (void***) (carray + num0);
-  ptr2 = (void**) (carray + num0 * (1 + num1));
-
-  for (i = 0; i < num0; ++i){
-    carray[i] = ptr1 + (i * num1);
-    for (j = 0; j < num1; ++j){
-      carray[i][j] = ptr2 + (i * num1 * num2) + (j * num2);
-      for (k = 0; k < num2; ++k){
-        carray[i][j][k] = PyArray_GETPTR4(pyarray, i, j, k, 0);
-      }
-    }
-  }
-  return carray;
-}
-
-
-static void *****
-cstyle5d_alloc(PyObject* pyarray)
-{
-  int i, j, k, l, num0, num1, num2, num3;
-  void *****carray, ****ptr1, ***ptr2, **ptr3;
-
-  num0 = PyArray_DIM(pyarray, 0);
-  num1 = PyArray_DIM(pyarray, 1);
-  num2 = PyArray_DIM(pyarray, 2);
-  num3 = PyArray_DIM(pyarray, 3);
-
-  carray = (void*****)
-    PyMem_Malloc(sizeof(void*) * (num0 * (1 + num1 * (1 + num2 * (1 + num3)))));
-  if (carray == NULL) return NULL;
-  ptr1 = (void****) (carray + num0);
-  ptr2 = (void***) (carray + num0 * (1 + num1));
-  ptr3 = (void**) (carray + num0 * (1 + num1 * (1 + num2)));
-
-  for (i = 0; i < num0; ++i){
-    carray[i] = ptr1 + (i * num1);
-    for (j = 0; j < num1; ++j){
-      carray[i][j] = ptr2 + (i * num1 * num2) + (j * num2);
-      for (k = 0; k < num2; ++k){
-        carray[i][j][k] = ptr3 +
-          (i * num1 * num2 * num3) + (j * num2 * num3) + (k * num3);
-        for (l = 0; l < num3; ++l){
-          carray[i][j][k][l] =
-            PyArray_GETPTR4((PyArrayObject*) pyarray, i, j, k, l);
-        }
-      }
+  /* pointers to the rows; idx is the index of the current row */
+  if (count[nd - 2] == 0) return carray;
+  row = PyArray_BYTES(pyarray);
+  for (k = 0; k < nd - 1; ++k) idx[k] = 0;
+  for (m = 0; m < count[nd - 2]; ++m){
+    carray[start[nd - 2] + m] = row;
+    for (k = nd - 2; k >= 0; --k){
+      ++idx[k];
+      row += strides[k];
+      if (idx[k] < dims[k]) break;
+      row -= dims[k] * strides[k];
+      idx[k] = 0;
     }
   }
   return carray;
@@ -145,15 +93,10 @@ CStyle_init(CStyle *self, PyObject *args, PyObject *kwds)
                                    &PyArray_Type, &pyarray)){
     return -1;
   }
-  /* check dimension (<= CStyle_MAXDIM) */
-  if (PyArray_NDIM(pyarray) > CStyle_MAXDIM){
-    PyErr_Format(PyExc_ValueError,
-                 "ndim of given numpy array (=%d) is larger than %d",
-                 PyArray_NDIM(pyarray), CStyle_MAXDIM);
-    return -1;
-  }else if (PyArray_NDIM(pyarray) == 1){
+  /* check dimension (>= 2) */
+  if (PyArray_NDIM((PyArrayObject*) pyarray) < 2){
     PyErr_SetString(PyExc_ValueError,
-                    "CStyle is not needed for 1D array!");
+                    "CStyle is only for arrays with ndim >= 2");
     return -1;
   }
 
@@ -166,16 +109,13 @@ CStyle_init(CStyle *self, PyObject *args, PyObject *kwds)
   }
 
   /* Allocate C-array */
-  switch (PyArray_NDIM(pyarray)){
-  case 2: self->carray = cstyle2d_alloc(self->pyarray); break;
-  case 3: self->carray = cstyle3d_alloc(self->pyarray); break;
-  case 4: self->carray = cstyle4d_alloc(self->pyarray); break;
-  case 5: self->carray = cstyle5d_alloc(self->pyarray); break;
+  if (self->carray != NULL){  /* __init__ is called twice */
+    PyMem_Free(self->carray);
   }
+  self->carray = cstyle_alloc((PyArrayObject*) self->pyarray);
 
   if (self->carray == NULL){
-    PyErr_NoMemory();
-    Py_XDECREF(pyarray);
+    PyErr_NoMemory();  /* self->pyarray is released by CStyle_dealloc */
     return -1;
   }
   self->pointer = (Py_ssize_t)self->carray;
@@ -100,9 +100,11 @@ def alpharange(*args):
     return mchr(numpy.arange(*args))
 
 
-def gene_class_ArrayAccess(clibname, nd, _list_cdt, carrtype=None):
+def gene_class_ArrayAccess(clibname, nd, _list_cdt, carrtype=None,
+                           cbackend='ctypes'):
     class ArrayAccess(SimObject):
         _clibname_ = clibname
+        _cbackend_ = cbackend
         _clibdir_ = relpath('ext/build', __file__)
         _cmembers_ = gene_cmembers(nd, _list_cdt, carrtype)
         _cfuncs_ = gene_cfuncs(nd, _list_cdt)
@@ -140,7 +142,7 @@ def gene_class_ArrayAccess(clibname, nd, _list_cdt, carrtype=None):
 
 
 def check_arrayaccess(clibname, list_num, list_cdt, cdt, dim,
-                      _calloc_=None, carrtype=None):
+                      _calloc_=None, carrtype=None, cbackend='ctypes'):
     """Check C side array access"""
     if cdt in ['char', 'short', 'ushort', 'int', 'uint', 'long', 'ulong',
                'longlong', 'ulonglong', 'bool', 'size_t']:
@@ -149,7 +151,7 @@ def check_arrayaccess(clibname, list_num, list_cdt, cdt, dim,
         ass_eq = assert_almost_equal
 
     ArrayAccess = gene_class_ArrayAccess(
-        clibname, len(list_num), list_cdt, carrtype)
+        clibname, len(list_num), list_cdt, carrtype, cbackend)
     num_dict = dict(zip(ArrayAccess.num_names, list_num))  # {num_i: 6, ...}
     if _calloc_ is not None:
         num_dict.update(_calloc_=_calloc_)
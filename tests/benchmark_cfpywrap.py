@@ -0,0 +1,48 @@
+from __future__ import print_function
+
+import timeit
+import numpy
+
+code_setup = """
+import types
+from railgun.simobj import gene_cfpywrap_generic
+from test_simobj import VectCalc
+vc = VectCalc(num_i=%(num_i)d)
+if %(generic)s:
+    for fname in vc._cfuncs_parsed_:
+        setattr(vc, fname, types.MethodType(
+            gene_cfpywrap_generic({}, vc._cfuncs_parsed_[fname]), vc))
+"""
+
+CASES = [
+    ('no argument', "vc.vec()"),
+    ('choice (kwds)', "vc.vec(op='minus')"),
+    ('defaults', "vc.subvec_dot()"),
+    ('positional', "vc.subvec_dot(1, 5)"),
+    ('keywords', "vc.subvec(i1=1, i2=5, op='times')"),
+    ]
+
+
+def main(repeat, number, num_i):
+    print("repeat: %d, number: %d, num_i: %d" % (repeat, number, num_i))
+    print("%-16s %12s %12s %8s" % ('case', 'generic [s]', 'fast [s]', 'ratio'))
+    for (name, stmt) in CASES:
+        mins = []
+        for generic in [True, False]:
+            setup = code_setup % dict(num_i=num_i, generic=generic)
+            results = numpy.array(timeit.repeat(
+                stmt, setup, repeat=repeat, number=number)) / number
+            mins.append(results.min())
+        print("%-16s %12.4g %12.4g %8.2f" % (
+            name, mins[0], mins[1], mins[0] / mins[1]))
+
+
+if __name__ == '__main__':
+    from optparse import OptionParser
+    parser = OptionParser()
+    parser.add_option("-r", "--repeat", type="int", default=5)
+    parser.add_option("-n", "--number", type="int", default=10000)
+    parser.add_option("-i", "--num-i", type="int", default=10)
+    (opts, args) = parser.parse_args()
+
+    main(opts.repeat, opts.number, opts.num_i)
@@ -0,0 +1,59 @@
+"""
+Benchmark class creation ("import time") of many SimObject subclasses
+
+Each case defines `--classes` classes generated by
+`arrayaccess.gene_class_ArrayAccess` (as a module defining many
+simulators does at import) and then instantiates one of them.
+
+"""
+from __future__ import print_function
+
+import timeit
+import numpy
+
+code_setup = """
+from railgun import SimObject
+from arrayaccess import gene_class_ArrayAccess
+from test_arrayaccess import LIST_NUM, LIST_CDT
+SimObject._clazy_ = %(lazy)s
+"""
+
+code_define = """
+classes = [gene_class_ArrayAccess('arrayaccess.so', len(LIST_NUM), LIST_CDT)
+           for _ in range(%(classes)d)]
+"""
+
+code_use = code_define + """
+classes[0](**dict(zip(classes[0].num_names, LIST_NUM)))
+"""
+
+CASES = [
+    ('define', code_define),
+    ('define + use one', code_use),
+    ]
+
+
+def main(repeat, number, classes):
+    print("repeat: %d, number: %d, classes: %d" % (repeat, number, classes))
+    print("%-18s %12s %12s %8s" % ('case', 'eager [s]', 'lazy [s]', 'ratio'))
+    for (name, stmt) in CASES:
+        mins = []
+        for lazy in [False, True]:
+            setup = code_setup % dict(lazy=lazy)
+            results = numpy.array(timeit.repeat(
+                stmt % dict(classes=classes), setup,
+                repeat=repeat, number=number)) / number
+            mins.append(results.min())
+        print("%-18s %12.4g %12.4g %8.2f" % (
+            name, mins[0], mins[1], mins[0] / mins[1]))
+
+
+if __name__ == '__main__':
+    from optparse import OptionParser
+    parser = OptionParser()
+    parser.add_option("-r", "--repeat", type="int", default=5)
+    parser.add_option("-n", "--number", type="int", default=1)
+    parser.add_option("-c", "--classes", type="int", default=40)
+    (opts, args) = parser.parse_args()
+
+    main(opts.repeat, opts.number, opts.classes)
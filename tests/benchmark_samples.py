@@ -0,0 +1,209 @@
+"""
+End-to-end workload benchmark built from the samples in the document
+
+Each workload creates a sample simulator of a fixed size, runs it and
+throws it away, so that allocation, wrapper overhead and time spent
+in C are measured together.  ``--tasks`` independent workloads are
+run serially, by :class:`railgun.parallel.ThreadPoolRunner` and by
+:class:`railgun.parallel.ProcessPoolRunner` (including the cost of
+moving arrays to shared memory and rebuilding the C struct in the
+workers), and the throughput is reported in steps/s and bytes/s
+(bytes of the C members reported by
+:meth:`railgun.SimObject.memory_report` per second).
+
+The shared libraries of the samples must be built first::
+
+    make --directory=../doc/source/samples/kaplan_yorke_map
+    make --directory=../doc/source/samples/lode_rk4
+    make --directory=../doc/source/samples/logistic_map  # needs GSL
+
+Workloads whose library (or its dependency) is not available, or
+which cannot be run by a runner, are skipped.
+
+"""
+from __future__ import print_function
+
+import functools
+import json
+import os
+import sys
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy
+
+from railgun import SimObject, relpath
+from railgun.parallel import ThreadPoolRunner, ProcessPoolRunner
+
+SAMPLES = relpath('../doc/source/samples', __file__)
+sys.path.extend(os.path.join(SAMPLES, d)
+                for d in ['lode_rk4', 'logistic_map'])
+
+
+class KaplanYorkeMap(SimObject):
+    # Same as the sample, which cannot be imported as it plots at import.
+    _clibname_ = 'libkaplan_yorke_map.so'
+    _clibdir_ = os.path.join(SAMPLES, 'kaplan_yorke_map')
+    _cmembers_ = [
+        'num_i',
+        'double xt[i]',
+        'double yt[i]',
+        'double mu',
+        'double lmd',
+        ]
+    _cfuncs_ = ["gene_seq()"]
+
+
+# Each workload returns ``(obj, fname, kwds, steps, calls)``: the
+# simulator, the method to be run by ``obj.FNAME(**kwds)``, the number
+# of steps and the number of times the C members are filled.
+def kaplan_yorke_map(scale):
+    num_i = int(10 ** 6 * scale)
+    kym = KaplanYorkeMap(num_i=num_i, mu=2, lmd=0.4, xt_0=0.1, yt_0=0.1)
+    return (kym, 'gene_seq', {}, num_i, 1)
+
+
+def lode_rk4(mode, scale):
+    from lode_rk4 import LinearODERK4
+    num_s = int(10 ** 5 * scale)
+    lode = LinearODERK4(num_s=num_s, num_d=2,
+                        _cmemsubsets_debug=(mode == 'debug'))
+    lode.x[0] = [1, 0]
+    lode.a = [[-0.5, 1], [-1, 0]]
+    return (lode, 'run', dict(mode=mode), num_s, 1)
+
+
+def logistic_map(scale):
+    from logistic_map import LogisticMap
+    (num_i, mu_num) = (1000, int(200 * scale))
+    lmap = LogisticMap(num_i, seed=0)
+    kwds = dict(mu_start=0, mu_stop=4, mu_num=mu_num, sigma=1e-5)
+    return (lmap, 'bifurcation_diagram', kwds, num_i * (mu_num + 1),
+            mu_num + 1)
+
+
+WORKLOADS = [
+    ('KaplanYorkeMap.gene_seq', kaplan_yorke_map),
+    ('LinearODERK4.run (normal)', functools.partial(lode_rk4, 'normal')),
+    ('LinearODERK4.run (debug)', functools.partial(lode_rk4, 'debug')),
+    ('LogisticMap.bifurcation_diagram', logistic_map),
+    ]
+
+
+class SerialRunner(object):
+
+    """Runner-like object calling C functions immediately"""
+
+    def __init__(self, executor=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def map(self, objs, fname, *args, **kwds):
+        futures = []
+        for obj in objs:
+            future = Future()
+            future.set_result(getattr(obj, fname)(*args, **kwds))
+            futures.append(future)
+        return futures
+
+
+# (mode, executor class, runner class).  Executors are shared by the
+# runners of a mode, so that workers are started only once.
+MODES = [
+    ('serial', None, SerialRunner),
+    ('threads', ThreadPoolExecutor, ThreadPoolRunner),
+    ('processes', ProcessPoolExecutor, ProcessPoolRunner),
+    ]
+
+
+def run(executor, runner_class, func, scale, tasks):
+    """
+    Create `tasks` simulators, run them by a runner and throw them away
+
+    A new runner is used each time, so that the shared memory of the
+    simulators is released.
+    """
+    sims = [func(scale) for _ in range(tasks)]
+    (_, fname, kwds, _, _) = sims[0]
+    with runner_class(executor=executor) as runner:
+        futures = runner.map([s[0] for s in sims], fname, **kwds)
+        [f.result() for f in futures]
+    return sims
+
+
+def measure(executor, runner_class, func, scale, tasks, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        sims = run(executor, runner_class, func, scale, tasks)
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    steps = sum(s[3] for s in sims)
+    nbytes = sum(s[0].memory_report()['total'] * s[4] for s in sims)
+    return dict(seconds=best, steps_per_sec=steps / best,
+                bytes_per_sec=nbytes / best)
+
+
+def main(repeat, scale, tasks, workers, output):
+    print("repeat: %d, scale: %g, tasks: %d, workers: %s" % (
+        repeat, scale, tasks, workers))
+    print("%-32s %-10s %10s %12s %12s" % (
+        'workload', 'mode', 'time [s]', 'steps/s', 'MB/s'))
+    workloads = []
+    for (name, func) in WORKLOADS:
+        try:
+            func(scale * 1e-3)  # load library
+        except Exception as err:
+            print("%-32s skipped (%s: %s)" % (name, type(err).__name__, err))
+        else:
+            workloads.append((name, func))
+    results = {}
+    for (mode, executor_class, runner_class) in MODES:
+        # pools are started (and warmed up) outside the measurement
+        executor = executor_class(workers) if executor_class else None
+        try:
+            for (name, func) in workloads:
+                try:
+                    run(executor, runner_class, func, scale * 1e-3, tasks)
+                except Exception as err:
+                    print("%-32s %-10s skipped (%s: %s)" % (
+                        name, mode, type(err).__name__, err))
+                    continue
+                res = measure(executor, runner_class, func, scale, tasks,
+                              repeat)
+                results['%s/%s' % (name, mode)] = res
+                print("%-32s %-10s %10.4g %12.4g %12.4g" % (
+                    name, mode, res['seconds'], res['steps_per_sec'],
+                    res['bytes_per_sec'] / 1e6))
+                sys.stdout.flush()
+        finally:
+            if executor is not None:
+                executor.shutdown()
+    if output:
+        with open(output, 'w') as f:
+            json.dump(dict(
+                meta=dict(repeat=repeat, scale=scale, tasks=tasks,
+                          workers=workers, numpy=numpy.__version__),
+                results=results), f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    from optparse import OptionParser
+    parser = OptionParser()
+    parser.add_option("-r", "--repeat", type="int", default=3)
+    parser.add_option("-s", "--scale", type="float", default=1.0,
+                      help="multiply size of each workload")
+    parser.add_option("-t", "--tasks", type="int", default=8,
+                      help="number of workloads per measurement")
+    parser.add_option("-w", "--workers", type="int", default=None,
+                      help="number of threads/processes (default: auto)")
+    parser.add_option("-o", "--output", help="write results to JSON file")
+    (opts, args) = parser.parse_args()
+
+    main(opts.repeat, opts.scale, opts.tasks, opts.workers, opts.output)
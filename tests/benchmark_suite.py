@@ -0,0 +1,195 @@
+"""
+Benchmark suite of the hot paths of RailGun
+
+Run in this directory (``tests/``) after building the test library
+(``make --directory=ext``)::
+
+    python benchmark_suite.py --output baseline.json
+    # ... change something ...
+    python benchmark_suite.py --baseline baseline.json
+
+Each case reports the best time per execution of its statement.
+With ``--baseline``, cases slower than the baseline by more than
+``--threshold`` (relative) are reported as regressions and the exit
+status is 1.  ``--filter`` selects cases by substring of their names.
+
+"""
+from __future__ import print_function
+
+import json
+import platform
+import sys
+import timeit
+
+import numpy
+
+code_setup_class = """
+from railgun import SimObject
+from arrayaccess import gene_class_ArrayAccess
+from test_arrayaccess import LIST_NUM, LIST_CDT
+SimObject._clazy_ = %(lazy)s
+"""
+
+code_setup_vectcalc = """
+import copy
+import pickle
+from test_simobj import VectCalc
+vc = VectCalc(num_i=%(num_i)d)
+"""
+
+code_setup_vectcalc_cffi = """
+from test_simobj import VectCalc
+VectCalcCFFI = type('VectCalc', (VectCalc,), dict(_cbackend_='cffi'))
+vc = VectCalcCFFI(num_i=10)
+"""
+
+code_setup_arrayaccess = """
+from arrayaccess import gene_class_ArrayAccess
+ArrayAccess = gene_class_ArrayAccess('arrayaccess.so', 3, ['int', 'double'])
+ArrayAccess._cfinalize_()
+nums = dict(num_i=%(num)d, num_j=%(num)d, num_k=%(num)d)
+"""
+
+
+def has_cffi():
+    from railgun import cffibackend
+    return cffibackend.cffi is not None
+
+
+def gene_cases():
+    """
+    Yield ``(name, stmt, setup)`` of the benchmark cases
+    """
+    # class creation (MetaSimObject)
+    for lazy in [True, False]:
+        setup = code_setup_class % dict(lazy=lazy)
+        yield ('class/%s' % ('lazy' if lazy else 'eager'),
+               "gene_class_ArrayAccess('arrayaccess.so', len(LIST_NUM), "
+               "LIST_CDT)", setup)
+    # construction (_set_all)
+    for num_i in [10, 100000]:
+        setup = code_setup_vectcalc % dict(num_i=num_i)
+        yield ('init/vectcalc/i=%d' % num_i, "VectCalc(num_i=%d)" % num_i,
+               setup)
+    for num in [2, 50]:
+        setup = code_setup_arrayaccess % dict(num=num)
+        for calloc in [True, False]:
+            yield ('init/3d/n=%d/calloc=%s' % (num, calloc),
+                   "ArrayAccess(_calloc_=%s, **nums)" % calloc, setup)
+    # per-call overhead of the wrappers
+    setup = code_setup_vectcalc % dict(num_i=10)
+    for (name, stmt) in [
+            ('nochoice', "vc.subvec_dot()"),
+            ('nochoice/args', "vc.subvec_dot(1, 5)"),
+            ('choice/default', "vc.vec()"),
+            ('choice/kwds', "vc.vec(op='minus')"),
+            ('choice/args+kwds', "vc.subvec(1, 5, op='times')"),
+            ]:
+        yield ('call/%s' % name, stmt, setup)
+    if has_cffi():
+        for (name, stmt) in [
+                ('nochoice', "vc.subvec_dot()"),
+                ('nochoice/args', "vc.subvec_dot(1, 5)"),
+                ]:
+            yield ('call/cffi/%s' % name, stmt, code_setup_vectcalc_cffi)
+    # reallocate
+    yield ('reallocate', "vc.reallocate(i=20); vc.reallocate(i=10)", setup)
+    yield ('reallocate/preserve',
+           "vc.reallocate(i=20, _preserve_=True); "
+           "vc.reallocate(i=10, _preserve_=True)", setup)
+    # setv / getv
+    yield ('setv/scalar', "vc.setv(ans=1)", setup)
+    yield ('setv/array', "vc.setv(v1=1, v2=2)", setup)
+    yield ('getv', "vc.getv('ans', 'v1')", setup)
+    # pickle and deepcopy
+    for num_i in [10, 100000]:
+        setup = code_setup_vectcalc % dict(num_i=num_i)
+        yield ('pickle/i=%d' % num_i,
+               "pickle.loads(pickle.dumps(vc, pickle.HIGHEST_PROTOCOL))",
+               setup)
+        yield ('deepcopy/i=%d' % num_i, "copy.deepcopy(vc)", setup)
+
+
+def measure(stmt, setup, repeat, number):
+    timer = timeit.Timer(stmt, setup)
+    if not number:
+        if hasattr(timer, 'autorange'):  # Python >= 3.6
+            (number, _) = timer.autorange()
+        else:
+            number = 1000
+    results = numpy.array(timer.repeat(repeat=repeat, number=number)) / number
+    return dict(best=results.min(), median=numpy.median(results),
+                number=number)
+
+
+def run(repeat, number, filter=''):
+    import railgun
+    results = {}
+    for (name, stmt, setup) in gene_cases():
+        if filter in name:
+            results[name] = measure(stmt, setup, repeat, number)
+            print("%-28s %12.4g" % (name, results[name]['best']))
+            sys.stdout.flush()
+    return dict(
+        meta=dict(python=platform.python_version(),
+                  numpy=numpy.__version__,
+                  railgun=railgun.__version__,
+                  machine=platform.machine(),
+                  repeat=repeat),
+        results=results)
+
+
+def compare(results, baseline, threshold):
+    """
+    Print the ratios to the baseline and return the regressed cases
+    """
+    regressions = []
+    print("%-28s %12s %12s %8s" % ('case', 'baseline [s]', 'current [s]',
+                                   'ratio'))
+    for name in sorted(results):
+        if name not in baseline:
+            continue
+        (old, new) = (baseline[name]['best'], results[name]['best'])
+        ratio = new / old
+        mark = ''
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            mark = ' *'
+        print("%-28s %12.4g %12.4g %8.2f%s" % (name, old, new, ratio, mark))
+    return regressions
+
+
+def main(repeat, number, filter, output, baseline, threshold):
+    data = run(repeat, number, filter)
+    if output:
+        with open(output, 'w') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+    if baseline:
+        with open(baseline) as f:
+            base = json.load(f)
+        print()
+        regressions = compare(data['results'], base['results'], threshold)
+        if regressions:
+            print("%d regression(s) (> %d%%): %s" % (
+                len(regressions), threshold * 100, ', '.join(regressions)))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    from optparse import OptionParser
+    parser = OptionParser()
+    parser.add_option("-r", "--repeat", type="int", default=5)
+    parser.add_option("-n", "--number", type="int", default=0,
+                      help="executions per repeat (0: automatic)")
+    parser.add_option("-f", "--filter", default='',
+                      help="run cases whose names contain this")
+    parser.add_option("-o", "--output", help="write results to JSON file")
+    parser.add_option("-b", "--baseline",
+                      help="compare with results in JSON file")
+    parser.add_option("-t", "--threshold", type="float", default=0.2,
+                      help="relative slowdown reported as regression")
+    (opts, args) = parser.parse_args()
+
+    sys.exit(main(opts.repeat, opts.number, opts.filter, opts.output,
+                  opts.baseline, opts.threshold))
@@ -104,3 +104,12 @@ int VectCalc_subvec_dot(VectCalc *self, int i1, int i2){
   }
   return 0;
 }
+
+/* Cumulative sum of v1 to v3, continuing from v3[0] */
+int VectCalc_cumsum(VectCalc *self){
+  int i;
+  for (i = 1; i < self->num_i; ++i){
+    self->v3[i] = self->v3[i - 1] + self->v1[i];
+  }
+  return 0;
+}
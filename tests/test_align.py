@@ -0,0 +1,131 @@
+import copy
+import unittest
+
+import numpy
+from numpy.testing import assert_equal
+
+from railgun import SimObjectArray
+from railgun.parallel import ProcessPoolRunner
+from railgun.simobj import alloc_aligned
+from arrayaccess import gene_class_ArrayAccess
+from test_arrayaccess import LIST_CDT
+from test_simobj import VectCalc
+
+LIST_NUM = [3, 5, 7, 2, 3]
+NUMS = dict(num_i=3, num_j=5, num_k=7, num_l=2, num_m=3)
+
+
+def gene_class(carrtype=None, **attrs):
+    base = gene_class_ArrayAccess(
+        'arrayaccess%s.so' % ('-flat' if carrtype else ''),
+        len(LIST_NUM), LIST_CDT, carrtype)
+    return type('ArrayAccessAligned', (base,), attrs)
+
+
+def check_layout(calloc, carrtype, calign, cpad):
+    ArrayAccess = gene_class(carrtype, _calign_=calign, _cpad_=cpad)
+    aa = ArrayAccess(_calloc_=calloc, **NUMS)
+    aa.fill()
+    for cdt in LIST_CDT:
+        for dim in range(1, 1 + len(LIST_NUM)):
+            arr = aa.arr(cdt, dim)
+            shape = tuple(LIST_NUM[:dim])
+            assert arr.shape == shape
+            assert arr.ctypes.data % calign == 0
+            padded = -(-shape[-1] // cpad) * cpad
+            if dim > 1:
+                assert arr.strides[-2] == padded * arr.itemsize
+            assert_equal(aa.arr_via_ret(cdt, dim), arr)
+    assert aa.num('i', 'j', 'k', 'l', 'm') == LIST_NUM
+
+
+def test_layout():
+    for calloc in [True, False]:
+        for (calign, cpad) in [(64, 1), (64, 8), (32, 3), (1, 4)]:
+            yield (check_layout, calloc, None, calign, cpad)
+    yield (check_layout, False, 'flat', 64, 1)
+
+
+class TestAlign(unittest.TestCase):
+
+    def test_flat_cannot_be_padded(self):
+        ArrayAccess = gene_class('flat', _cpad_=4)
+        self.assertRaises(ValueError, ArrayAccess, **NUMS)
+
+    def test_per_member(self):
+        ArrayAccess = gene_class(_calign_={'double2d': 4096},
+                                 _cpad_={'int2d': 4})
+        aa = ArrayAccess(**NUMS)
+        self.assertEqual(aa.double2d.ctypes.data % 4096, 0)
+        self.assertTrue(aa.double2d.flags.c_contiguous)
+        self.assertEqual(aa.int2d.strides, (32, 4))
+        self.assertEqual(aa.int3d.strides, (5 * 7 * 4, 7 * 4, 4))
+
+    def test_pickle(self):
+        ArrayAccess = gene_class(_calign_=64, _cpad_=8)
+        aa = ArrayAccess(**NUMS)
+        aa.fill()
+        clone = copy.deepcopy(aa)
+        assert_equal(clone.double3d, aa.double3d)
+        self.assertEqual(clone.double3d.ctypes.data % 64, 0)
+        self.assertEqual(clone.double3d.strides, aa.double3d.strides)
+        assert_equal(clone.arr_via_ret('double', 3), aa.double3d)
+
+    def test_reallocate(self):
+        ArrayAccess = gene_class(_calign_=64, _cpad_=8)
+        aa = ArrayAccess(**NUMS)
+        aa.fill()
+        expected = aa.int2d.copy()
+        aa.reallocate(i=10, _preserve_=True)
+        self.assertEqual(aa.int2d.ctypes.data % 64, 0)
+        assert_equal(aa.int2d[:3], expected)
+        assert_equal(aa.arr_via_ret('int', 2), aa.int2d)
+        aa.reallocate(j=9)
+        self.assertEqual(aa.int2d.strides, (16 * 4, 4))
+        self.assertEqual(aa.num_j, 9)
+
+    def test_memory_report(self):
+        ArrayAccess = gene_class(_cpad_=8)
+        report = ArrayAccess(**NUMS).memory_report()
+        self.assertEqual(report['members']['double2d']['spare'],
+                         3 * 3 * 8)
+        self.assertEqual(report['total'], ArrayAccess.estimate_nbytes(**NUMS))
+
+    def test_bind(self):
+        Aligned = type('VectCalcAligned', (VectCalc,), dict(_calign_=64))
+        vc = Aligned()
+        raw = alloc_aligned((11,), numpy.int32, 64)
+        self.assertRaises(ValueError, vc.bind, v1=raw[1:])
+        vc.bind(v1=raw[:10])
+        self.assertEqual(vc.v1.ctypes.data, raw.ctypes.data)
+        self.assertEqual(vc.v1.ctypes.data % 64, 0)
+        self.assertEqual(vc.v1.shape, (10,))  # not padded
+        raw[:10] = numpy.arange(10)
+        vc.vec(op='plus')  # C function sees `raw`
+        assert_equal(vc.v3, numpy.arange(10) + 2)
+        Padded = type('VectCalcPadded', (VectCalc,), dict(_cpad_=16))
+        vc = Padded()
+        v1 = vc.v1
+        self.assertRaises(ValueError, vc.bind, v1=raw[:10])
+        self.assertIs(vc.v1, v1)  # padded array is kept
+
+    def test_simobjarray(self):
+        Aligned = type('VectCalcAligned', (VectCalc,), dict(_calign_=64))
+        self.assertRaises(ValueError, SimObjectArray, Aligned, 3)
+
+
+class VectCalcPadded(VectCalc):
+    _calign_ = 64
+    _cpad_ = 16
+
+
+class TestProcessPoolRunner(unittest.TestCase):
+
+    def test_padded(self):
+        objs = [VectCalcPadded(v1=numpy.arange(10) * k) for k in range(3)]
+        with ProcessPoolRunner(max_workers=2) as runner:
+            futures = runner.map(objs, 'vec', op='plus')
+            [f.result() for f in futures]
+            for obj in objs:
+                assert_equal(obj.v3, obj.v1 + obj.v2)
+                self.assertEqual(obj.v3.ctypes.data % 64, 0)
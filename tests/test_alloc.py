@@ -0,0 +1,174 @@
+import copy
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy
+from numpy.testing import assert_equal
+
+from tsutils import eq_
+from arrayaccess import gene_class_ArrayAccess
+from test_arrayaccess import LIST_CDT
+from test_simobj import VectCalc
+
+
+class VectCalcRecordAlloc(VectCalc):
+
+    def _alloc_carray(self, parsed, shape, zeros=True):
+        self.__dict__.setdefault('allocated', {})[parsed.vname] = zeros
+        return super(VectCalcRecordAlloc, self)._alloc_carray(
+            parsed, shape, zeros)
+
+
+class TestZeroFill(unittest.TestCase):
+
+    def test_default_and_kwds(self):
+        vc = VectCalcRecordAlloc(v2=numpy.arange(10))
+        # v1 has default, v2 is given and v3 has no default
+        self.assertEqual(vc.allocated, dict(v1=False, v2=False, v3=True))
+        assert_equal(vc.v1, 1)
+        assert_equal(vc.v2, numpy.arange(10))
+        assert_equal(vc.v3, 0)
+
+    def test_array_alias(self):
+        vc = VectCalcRecordAlloc(v3_1=5)
+        self.assertTrue(vc.allocated['v3'])
+        assert_equal(vc.v3, [0, 5] + [0] * 8)
+
+    def test_reallocate(self):
+        vc = VectCalcRecordAlloc()
+        vc.reallocate(i=20)
+        self.assertEqual(vc.allocated, dict(v1=True, v2=True, v3=True))
+        assert_equal(vc.v1, 0)
+
+
+class TestMemmap(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'v3.npy')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_c_writes_to_file(self):
+        vc = VectCalc(v1=numpy.arange(10), v2=numpy.arange(10),
+                      _cmemmap_=dict(v3=self.path))
+        self.assertTrue(isinstance(vc.v3, numpy.memmap))
+        vc.vec()
+        vc.v3.flush()
+        assert_equal(numpy.load(self.path), numpy.arange(10) * 2)
+
+    def test_restart(self):
+        vc = VectCalc(_cmemmap_=dict(v3=self.path))
+        vc.v3 = numpy.arange(10)
+        del vc
+        vc = VectCalc(_cmemmap_=dict(v3=self.path))
+        assert_equal(vc.v3, numpy.arange(10))
+        # explicitly given values override the contents of the file
+        vc = VectCalc(v3=1, _cmemmap_=dict(v3=self.path))
+        assert_equal(vc.v3, 1)
+        assert_equal(numpy.load(self.path), 1)
+
+    def test_restart_char(self):
+        # the library expects the struct of all types and dimensions
+        ArrayAccess = gene_class_ArrayAccess('arrayaccess.so', 5, LIST_CDT)
+        nums = dict(num_i=5, num_j=2, num_k=2, num_l=2, num_m=2)
+        aa = ArrayAccess(_cmemmap_=dict(char1d=self.path), **nums)
+        eq_(aa.char1d.dtype, numpy.dtype('S1'))
+        aa.char1d[:] = [b'a', b'b', b'c', b'd', b'e']
+        assert_equal(aa.arr_via_ret('char', 1), aa.char1d)
+        del aa
+        aa = ArrayAccess(_cmemmap_=dict(char1d=self.path), **nums)
+        eq_(aa.char1d.tobytes(), b'abcde')
+
+    def test_restart_shape_mismatch(self):
+        VectCalc(_cmemmap_=dict(v3=self.path))
+        self.assertRaises(ValueError, VectCalc, num_i=20,
+                          _cmemmap_=dict(v3=self.path))
+
+    def test_reallocate(self):
+        vc = VectCalc(v3=1, _cmemmap_=dict(v3=self.path))
+        old = vc.v3
+        vc.reallocate(i=20)
+        assert_equal(vc.v3, 0)
+        assert_equal(numpy.load(self.path).shape, (20,))
+        assert_equal(old, 1)  # old array is still accessible
+
+    def test_not_array(self):
+        self.assertRaises(ValueError, VectCalc, _cmemmap_=dict(ans=self.path))
+
+    def test_bind(self):
+        vc = VectCalc(_cmemmap_=dict(v3=self.path))
+        self.assertRaises(ValueError, vc.bind, v3=numpy.zeros(10))
+
+    def test_copy_is_not_backed(self):
+        vc = VectCalc(v3=1, _cmemmap_=dict(v3=self.path))
+        clone = copy.deepcopy(vc)
+        clone.v3 = 2
+        assert_equal(vc.v3, 1)
+        assert_equal(numpy.load(self.path), 1)
+
+
+class VectCalcCountAlloc(VectCalc):
+
+    def _alloc_carray(self, parsed, shape, zeros=True):
+        self.__dict__.setdefault('nalloc', 0)
+        self.nalloc += 1
+        return super(VectCalcCountAlloc, self)._alloc_carray(
+            parsed, shape, zeros)
+
+
+class TestReallocatePreserve(unittest.TestCase):
+
+    def test_keep_data(self):
+        vc = VectCalc(v1=numpy.arange(10))
+        vc.reallocate(i=15, _preserve_=True)
+        assert_equal(vc.v1, list(range(10)) + [0] * 5)
+        vc.reallocate(i=5, _preserve_=True)
+        assert_equal(vc.v1, numpy.arange(5))
+        vc.reallocate(i=8, _preserve_=True)
+        assert_equal(vc.v1, list(range(5)) + [0] * 3)  # zero-filled
+
+    def test_c_function(self):
+        vc = VectCalc(v1=numpy.arange(10), v2=numpy.arange(10))
+        vc.reallocate(i=15, _preserve_=True)
+        vc.v1[10:] = 1
+        vc.v2[10:] = 2
+        vc.vec()
+        assert_equal(vc.v3, list(range(0, 20, 2)) + [3] * 5)
+        eq_(vc.subvec_dot(10, 15), 1 * 2 * 5)
+
+    def test_amortized(self):
+        vc = VectCalcCountAlloc(num_i=1)
+        vc.nalloc = 0
+        for n in range(2, 1025):
+            vc.v1[-1] = n - 1
+            vc.reallocate(i=n, _preserve_=True)
+            vc.vec()
+        assert_equal(vc.v1, list(range(1, 1024)) + [0])
+        # 3 arrays are reallocated when num_i = 2, 4, 8, ..., 1024
+        eq_(vc.nalloc, 3 * 10)
+
+    def test_grow_other_axis(self):
+        ArrayAccess = gene_class_ArrayAccess('arrayaccess.so', 2, ['double'])
+        aa = ArrayAccess(num_i=3, num_j=1)
+        aa.double2d[:] = [[0], [1], [2]]
+        for n in range(2, 41):
+            aa.reallocate(j=n, _preserve_=True)
+        eq_(aa._cdatastore_['Capacity:double2d'].shape, (3, 40))
+        assert_equal(aa.double2d[:, 0], [0, 1, 2])
+        # capacity along the first axis is kept but does not grow
+        aa.reallocate(i=4, _preserve_=True)
+        for n in range(41, 81):
+            aa.reallocate(j=n, _preserve_=True)
+        eq_(aa._cdatastore_['Capacity:double2d'].shape, (6, 80))
+        eq_(aa.double2d.shape, (4, 80))
+
+    def test_reallocate_without_preserve(self):
+        vc = VectCalc()
+        vc.reallocate(i=15, _preserve_=True)
+        vc.reallocate(i=5)
+        self.assertFalse('Capacity:v1' in vc._cdatastore_)
+        assert_equal(vc.v1, 0)
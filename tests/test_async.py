@@ -0,0 +1,50 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy
+from numpy.testing import assert_equal
+
+from tsutils import eq_
+from test_simobj import VectCalc
+try:
+    import asyncio
+except ImportError:
+    asyncio = None
+
+
+class TestAsync(unittest.TestCase):
+
+    def setUp(self):
+        if asyncio is None:
+            raise unittest.SkipTest('asyncio is not available')
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        asyncio.set_event_loop(None)
+        self.loop.close()
+
+    def run_loop(self, aw):
+        return self.loop.run_until_complete(aw)
+
+    def test_same_as_sync(self):
+        vc = VectCalc(v1=numpy.arange(10), v2=numpy.arange(10))
+        eq_(self.run_loop(vc.asubvec_dot(2, 5)), vc.subvec_dot(2, 5))
+        eq_(self.run_loop(vc.avec(op='times')), None)
+        assert_equal(vc.v3, numpy.arange(10) ** 2)
+
+    def test_gather(self):
+        sims = [VectCalc(v1=numpy.arange(10) * k) for k in range(4)]
+        rets = self.run_loop(asyncio.gather(
+            *[vc.asubvec_dot() for vc in sims]))
+        eq_(rets, [vc.subvec_dot() for vc in sims])
+
+    def test_executor(self):
+        vc = VectCalc()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            vc._cexecutor_ = executor
+            eq_(self.run_loop(vc.asubvec_dot()), vc.subvec_dot())
+
+    def test_error(self):
+        vc = VectCalc(v2=0)
+        self.assertRaises(RuntimeError, self.run_loop, vc.avec(op='divide'))
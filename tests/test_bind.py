@@ -0,0 +1,59 @@
+import unittest
+
+import numpy
+from numpy.testing import assert_equal
+
+from railgun.simobj import CDT2DTYPE
+from test_simobj import VectCalc, VectCalcCMemSubSet
+from arrayaccess import gene_class_ArrayAccess
+from test_arrayaccess import LIST_CDT, LIST_NUM
+
+
+class TestBind(unittest.TestCase):
+
+    def test_bind_flat(self):
+        vc = VectCalc()
+        v3 = numpy.zeros(10, dtype=CDT2DTYPE['int'])
+        vc.bind(v3=v3)
+        self.assertIs(vc.v3, v3)
+        vc.vec()
+        assert_equal(v3, vc.v1 + vc.v2)
+
+    def test_bind_share(self):
+        vc1 = VectCalc()
+        vc2 = VectCalc()
+        vc2.bind(v1=vc1.v3)
+        vc1.vec(op='plus')
+        vc2.vec(op='times')
+        assert_equal(vc2.v3, 3 * 2)
+
+    def test_bind_iliffe(self):
+        ArrayAccess = gene_class_ArrayAccess(
+            'arrayaccess.so', len(LIST_NUM), LIST_CDT)
+        num_dict = dict(zip(ArrayAccess.num_names, LIST_NUM))
+        shape = tuple(LIST_NUM[:3])
+        for calloc in [True, False]:
+            aa = ArrayAccess(_calloc_=calloc, **num_dict)
+            arr = numpy.arange(numpy.prod(shape), dtype=CDT2DTYPE['double'])
+            arr = arr.reshape(shape)
+            aa.bind(double3d=arr)
+            assert_equal(aa.arr_via_ret('double', 3), arr)
+
+    def check_bind_error(self, vc, **kwds):
+        v1 = vc.v1
+        self.assertRaises(ValueError, vc.bind, **kwds)
+        self.assertIs(vc.v1, v1)
+
+    def test_bind_error(self):
+        vc = VectCalc()
+        dtype = CDT2DTYPE['int']
+        ok = numpy.zeros(10, dtype=dtype)
+        self.check_bind_error(vc, v1=ok, v2=numpy.zeros(10))
+        self.check_bind_error(vc, v1=ok, v2=numpy.zeros(9, dtype=dtype))
+        self.check_bind_error(vc, v1=ok, v2=numpy.zeros(20, dtype=dtype)[::2])
+        self.check_bind_error(vc, v1=ok, v2=list(range(10)))
+        readonly = numpy.zeros(10, dtype=dtype)
+        readonly.flags.writeable = False
+        self.check_bind_error(vc, v1=ok, v2=readonly)
+        self.check_bind_error(vc, v1=ok, ans=ok)
+        self.check_bind_error(VectCalcCMemSubSet(), v3=ok)
@@ -0,0 +1,72 @@
+import numpy
+from numpy.testing import assert_equal
+from nose.tools import raises
+
+from tsutils import eq_
+from test_simobj import VectCalc
+from test_cerrors import VectCalcBase
+
+
+def make():
+    return VectCalc(v1=numpy.arange(1, 11), v2=numpy.arange(11, 21))
+
+
+def test_call_many_ret():
+    vc = make()
+    argseq = [(i1, i2) for i1 in range(10) for i2 in range(i1 + 1, 11)]
+    desired = [vc.subvec_dot(*args) for args in argseq]
+    eq_(vc.call_many('subvec_dot', argseq), desired)
+    eq_(vc.call_many('subvec_dot', numpy.array(argseq)), desired)
+
+
+def test_call_many_partial_args():
+    vc = make()
+    desired = [vc.subvec_dot(i1) for i1 in range(10)]
+    eq_(vc.call_many('subvec_dot', range(10)), desired)
+    eq_(vc.call_many('subvec_dot', [(i1,) for i1 in range(10)]), desired)
+    desired = [vc.subvec_dot(i2=i2) for i2 in range(1, 11)]
+    eq_(vc.call_many('subvec_dot', [()] * 10, i2=10), [desired[-1]] * 10)
+
+
+def test_call_many_choices():
+    vc = make()
+    vc.call_many('fill', [(3,)], vec='v3')
+    assert_equal(vc.v3, 3)
+    vc.call_many('subvec', [(0, 5), (5, 10)], op='times')
+    assert_equal(vc.v3, vc.v1 * vc.v2)
+
+
+@raises(ValueError)
+def test_call_many_choices_in_rows():
+    vc = make()
+    vc.call_many('subvec', [(0, 10, 'plus'), (0, 10, 'minus')])
+
+
+def test_call_many_no_ret():
+    vc = make()
+    eq_(vc.call_many('vec', [()] * 3), None)
+    eq_(vc.call_many('subvec_dot', []), [])
+    eq_(vc.call_many('subvec_dot', numpy.zeros((0, 2), dtype=int)), [])
+    eq_(vc.call_many('subvec_dot', numpy.array([])), [])
+
+
+def test_call_many_index_check():
+    vc = make()
+    call_many_error = raises(ValueError)(vc.call_many)
+    call_many_error('subvec_dot', [(0, 10), (-1, 10)])
+    call_many_error('subvec_dot', [(0, 10), (0, 11)])
+    call_many_error('subvec_dot', numpy.array([(0, 10), (10, 10)]))
+    call_many_error('subvec_dot', [(0, 10), (0,)])
+    call_many_error('subvec_dot', [(0, 1, 2, 3)])
+    eq_(vc.ans, 0)  # nothing is called
+
+
+@raises(ZeroDivisionError)
+def test_call_many_cerrors():
+
+    class VectCalc(VectCalcBase):
+        _cerrors_ = {1: ZeroDivisionError()}
+
+    vc = VectCalc()
+    vc.v2[5] = 0
+    vc.call_many('subvec', [(0, 5), (0, 10)], op='divide')
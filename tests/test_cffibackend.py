@@ -0,0 +1,119 @@
+import copy
+import unittest
+from ctypes import addressof, POINTER, c_int
+
+import numpy
+from numpy.testing import assert_equal
+
+from railgun import SimObject, SimObjectArray, cffibackend, cmem
+from railgun.parallel import ProcessPoolRunner
+from tsutils import eq_
+from arrayaccess import check_arrayaccess
+from test_arrayaccess import LIST_CDT, LIST_NUM, NDIM
+from test_simobj import TestVectCalc, VectCalc
+
+
+def with_cffi(cls):
+    """Subclass of a `VectCalc`-like class using the cffi backend"""
+    return type(cls.__name__, (cls,),
+                dict(_cbackend_='cffi', _cstructname_='VectCalc'))
+
+
+class VectCalcCFFI(VectCalc):
+    _cstructname_ = 'VectCalc'
+    _cbackend_ = 'cffi'
+
+
+def skip_without_cffi():
+    if cffibackend.cffi is None:
+        raise unittest.SkipTest('cffi is not available')
+
+
+def test_arrayaccess():
+    skip_without_cffi()
+    for cdt in LIST_CDT:
+        for dim in range(1, 1 + NDIM):
+            yield (check_arrayaccess, 'arrayaccess.so', LIST_NUM, LIST_CDT,
+                   cdt, dim, None, None, 'cffi')
+
+
+class TestVectCalcCFFI(TestVectCalc):
+
+    VectCalc = with_cffi(TestVectCalc.VectCalc)
+    VectCalcWithCwrap = with_cffi(TestVectCalc.VectCalcWithCwrap)
+    VectCalcSuperInSubClass = with_cffi(TestVectCalc.VectCalcSuperInSubClass)
+    VectCalcSuperInBaseClass = with_cffi(
+        TestVectCalc.VectCalcSuperInBaseClass)
+    VectCalcNoDefaultNumI = with_cffi(TestVectCalc.VectCalcNoDefaultNumI)
+    VectCalcFixedShape = with_cffi(TestVectCalc.VectCalcFixedShape)
+    VectCalcCMemSubSet = with_cffi(TestVectCalc.VectCalcCMemSubSet)
+    VectCalcCMemObject = with_cffi(TestVectCalc.VectCalcCMemObject)
+
+    def setUp(self):
+        skip_without_cffi()
+        super(TestVectCalcCFFI, self).setUp()
+
+    def test_struct_is_shared(self):
+        vc = self.vc
+        ffi = vc._cdll_.ffi
+        eq_(int(ffi.cast('uintptr_t', vc._struct_p_)), addressof(vc._struct_))
+        vc.ans = 7
+        eq_(vc._struct_p_.ans, 7)
+        eq_(ffi.cast('uintptr_t', vc._struct_p_.v1),
+            vc.v1.ctypes.data)
+
+
+class TestCFFIBackend(unittest.TestCase):
+
+    def setUp(self):
+        skip_without_cffi()
+
+    def test_call_many(self):
+        vc = VectCalcCFFI(v1=numpy.arange(10), v2=3)
+        eq_(vc.call_many('subvec_dot', [(0, 1), (0, 2), (1, 3)]),
+            [0, 3, 9])
+
+    def test_deepcopy(self):
+        vc = VectCalcCFFI(v1=numpy.arange(10))
+        clone = copy.deepcopy(vc)
+        clone.vec(op='plus')
+        assert_equal(clone.v3, numpy.arange(10) + 2)
+        assert_equal(vc.v3, 0)
+
+    def test_simobjarray(self):
+        sims = SimObjectArray(VectCalcCFFI, 3)
+        for (k, vc) in enumerate(sims):
+            vc.v1 = k
+        sims.call('vec', op='times')
+        assert_equal(sims.v3, [[0] * 10, [2] * 10, [4] * 10])
+
+    def test_process_pool(self):
+        objs = [VectCalcCFFI(v1=numpy.arange(10) * k) for k in range(3)]
+        with ProcessPoolRunner(max_workers=2) as runner:
+            [f.result() for f in runner.map(objs, 'vec', op='plus')]
+        for obj in objs:
+            assert_equal(obj.v3, obj.v1 + obj.v2)
+
+    def test_unknown_backend(self):
+        VectCalcUnknown = type('VectCalc', (VectCalc,),
+                               dict(_cbackend_='unknown'))
+        self.assertRaises(ValueError, VectCalcUnknown)
+
+    def test_object_must_be_pointer(self):
+        class NotPointer(object):
+            _ctype_ = c_int
+
+        class Pointer(object):
+            _ctype_ = POINTER(c_int)
+
+        for (cdt, error) in [(NotPointer, ValueError), (Pointer, None)]:
+            cls = type('VectCalc', (SimObject,), dict(
+                _clibname_=VectCalc._clibname_,
+                _clibdir_=VectCalc._clibdir_,
+                _cmembers_=['num_i = 10', cmem(cdt, 'obj')],
+                _cfuncs_=[],
+                _cbackend_='cffi'))
+            if error:
+                self.assertRaises(error, cls)
+            else:
+                cls()
@@ -0,0 +1,85 @@
+import types
+
+import numpy
+from numpy.testing import assert_equal
+from nose.tools import raises
+
+from tsutils import eq_
+from railgun.simobj import gene_cfpywrap_generic
+from test_simobj import VectCalc, VectCalcCMemSubSet, gene_vectcalc
+
+
+def generic_method(obj, fname):
+    """Get method of `obj` generated by `gene_cfpywrap_generic`"""
+    cfdec = obj._cfuncs_parsed_[fname]
+    return types.MethodType(gene_cfpywrap_generic({}, cfdec), obj)
+
+
+def call_both(simclass, fname, args, kwds):
+    results = []
+    for getmethod in [getattr, generic_method]:
+        obj = simclass(v1=numpy.arange(10), v2=numpy.arange(10, 20))
+        try:
+            ret = getmethod(obj, fname)(*args, **kwds)
+        except Exception as err:
+            results.append((type(err), str(err), None, None))
+        else:
+            v3 = obj._cdatastore_.get('v3')  # may not be allocated
+            results.append((None, ret, numpy.copy(v3), obj.ans))
+    return results
+
+
+def check_same_as_generic(simclass, fname, args, kwds):
+    (actual, desired) = call_both(simclass, fname, args, kwds)
+    eq_(actual[:2], desired[:2],
+        '%s(*%r, **%r)' % (fname, args, kwds))
+    assert_equal(actual[2], desired[2])
+    eq_(actual[3], desired[3])
+
+
+DATA_CALLS = [
+    ('vec', (), {}),
+    ('vec', ('minus',), {}),
+    ('vec', (), dict(op='times')),
+    ('vec', (), dict(op='no_such_op')),
+    ('vec', ('plus',), dict(op='plus')),
+    ('vec', ('plus', 'minus'), {}),
+    ('vec', (), dict(unknown=1)),
+    ('subvec', (), {}),
+    ('subvec', (2, 5), {}),
+    ('subvec', (2,), dict(i2=5, op='divide')),
+    ('subvec', (2, 5, 'times'), {}),
+    ('subvec', (), dict(i1=-1)),
+    ('subvec', (), dict(i2=0)),
+    ('subvec', (), dict(i2=11)),
+    ('subvec', (0, 10, 'plus', 1), {}),
+    ('subvec', (1,), dict(i1=1)),
+    ('fill', (), {}),
+    ('fill', (7,), {}),
+    ('fill', (7, 'v3'), {}),
+    ('fill', (), dict(s=3, vec='v2')),
+    ('subvec_dot', (), {}),
+    ('subvec_dot', (3, 6), {}),
+    ('subvec_dot', (3,), dict(i2=3)),
+    ]
+
+
+def test_same_as_generic():
+    for (fname, args, kwds) in DATA_CALLS:
+        yield (check_same_as_generic, VectCalc, fname, args, kwds)
+
+
+def test_same_as_generic_cmemsubsets():
+    for (fname, args, kwds) in DATA_CALLS:
+        yield (check_same_as_generic, VectCalcCMemSubSet, fname, args, kwds)
+
+
+def test_default_evaluated_at_call():
+    VectCalcLateDefault = gene_vectcalc(_cfuncs_=[
+        "fill_{vec | v1, v2, v3}(int s=not_defined.value)",
+        "ans subvec_dot(i i1=0, i< i2=num_i)",
+    ])
+    vc = VectCalcLateDefault()  # the default is not evaluated yet
+    vc.fill(3)
+    assert_equal(vc.v1, 3)
+    raises(NameError)(vc.fill)()
@@ -0,0 +1,115 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy
+from numpy.testing import assert_equal
+
+from railgun import checkpoint
+from arrayaccess import gene_class_ArrayAccess
+from test_arrayaccess import LIST_CDT
+from test_simobj import VectCalc, VectCalcCMemSubSet
+
+NUMS = dict(num_i=3, num_j=5, num_k=7, num_l=2, num_m=3)
+
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'checkpoint')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def header(self):
+        with open(os.path.join(self.path, checkpoint.HEADER)) as f:
+            return json.load(f)
+
+    def test_save_load(self):
+        vc = VectCalc(num_i=20, v1=numpy.arange(20), ans=5)
+        vc.save(self.path)
+        header = self.header()
+        self.assertEqual(header['nums'], dict(num_i=20))
+        self.assertEqual(header['scalars'], dict(ans=5))
+        self.assertEqual(sorted(header['arrays']), ['v1', 'v2', 'v3'])
+        loaded = VectCalc.load(self.path)
+        self.assertEqual((loaded.num_i, loaded.ans), (20, 5))
+        assert_equal(loaded.v1, vc.v1)
+        assert_equal(loaded.v2, vc.v2)
+        loaded.vec(op='plus')
+        assert_equal(loaded.v3, vc.v1 + vc.v2)
+
+    def test_mmap_mode(self):
+        VectCalc(v1=numpy.arange(10)).save(self.path)
+        loaded = VectCalc.load(self.path)
+        self.assertIsInstance(loaded.v1, numpy.memmap)  # not copied
+        loaded.v1[:] = 0
+        loaded.vec(op='plus')
+        assert_equal(loaded.v3, 2)
+        # copy-on-write: the checkpoint is not changed
+        assert_equal(VectCalc.load(self.path).v1, numpy.arange(10))
+        loaded = VectCalc.load(self.path, mmap_mode=None)
+        self.assertNotIsInstance(loaded.v1, numpy.memmap)
+        assert_equal(loaded.v1, numpy.arange(10))
+
+    def test_background(self):
+        vc = VectCalc(num_i=1000, v1=numpy.arange(1000))
+        future = vc.save(self.path, background=True, chunkbytes=100,
+                         threads=2)
+        vc.v1[:] = -1  # the snapshot is already taken
+        self.assertIsNone(future.result())
+        assert_equal(VectCalc.load(self.path).v1, numpy.arange(1000))
+
+    def test_background_error(self):
+        open(self.path, 'w').close()  # cannot be a directory
+        future = VectCalc().save(self.path, background=True)
+        self.assertRaises(OSError, future.result)
+
+    def test_incomplete(self):
+        VectCalc().save(self.path)
+        os.remove(os.path.join(self.path, checkpoint.HEADER))
+        self.assertRaises(ValueError, VectCalc.load, self.path)
+
+    def test_overwrite(self):
+        VectCalc(num_i=5).save(self.path)
+        VectCalc(num_i=7, v2=3).save(self.path)
+        loaded = VectCalc.load(self.path)
+        self.assertEqual(loaded.num_i, 7)
+        assert_equal(loaded.v2, 3)
+
+    def test_shape_mismatch(self):
+        VectCalc().save(self.path)
+        numpy.save(os.path.join(self.path, 'v1.npy'), numpy.zeros(3, 'i4'))
+        self.assertRaises(ValueError, VectCalc.load, self.path)
+
+    def test_other_class(self):
+        VectCalc(v1=numpy.arange(10)).save(self.path)
+        self.assertRaises(ValueError, VectCalcCMemSubSet.load, self.path)
+        loaded = VectCalcCMemSubSet.load(self.path, strict=False)
+        assert_equal(loaded.v1, numpy.arange(10))
+
+    def test_cmemsubsets(self):
+        vc = VectCalcCMemSubSet()
+        vc.save(self.path)
+        self.assertEqual(sorted(self.header()['arrays']), ['v1', 'v2'])
+        loaded = VectCalcCMemSubSet.load(self.path)
+        self.assertEqual(loaded._cmemsubsets_parsed_.getall(),
+                         dict(vec=False, dot=True))
+        self.assertNotIn('v3', loaded._cdatastore_)
+        self.assertEqual(loaded.subvec_dot(), vc.subvec_dot())
+
+    def test_arrayaccess(self):
+        ArrayAccess = gene_class_ArrayAccess('arrayaccess.so', 5, LIST_CDT)
+        Padded = type('ArrayAccess', (ArrayAccess,), dict(_cpad_=4))
+        aa = Padded(ret_char=b'x', **NUMS)
+        aa.fill()
+        aa.save(self.path, chunkbytes=64)
+        loaded = Padded.load(self.path)
+        self.assertEqual(loaded.ret_char, b'x')
+        for cdt in LIST_CDT:
+            for dim in range(1, 6):
+                assert_equal(loaded.arr(cdt, dim), aa.arr(cdt, dim))
+                assert_equal(loaded.arr_via_ret(cdt, dim), aa.arr(cdt, dim))
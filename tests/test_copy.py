@@ -1,10 +1,14 @@
 import copy
+import unittest
 
 try:
     import cPickle as pickle
 except ImportError:
     import pickle
 
+import numpy
+from numpy.testing import assert_equal
+
 from test_simobj import BaseTestVectCalc, TestVectCalc
 
 
@@ -53,6 +57,42 @@ class TestPickleVectCalc(MixinPickleTest, TestVectCalc):
     pass
 
 
+HAS_PICKLE5 = pickle.HIGHEST_PROTOCOL >= 5
+
+
+class MixinPickle5Test(MixinCopyTest):
+
+    """
+    Test that SimObject can be pickled with out-of-band buffers.
+    """
+
+    @staticmethod
+    def copyfunc(obj):
+        buffers = []
+        data = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+        return pickle.loads(data, buffers=buffers)
+
+
+@unittest.skipUnless(HAS_PICKLE5, 'pickle protocol 5 is not supported')
+class TestPickle5VectCalc(MixinPickle5Test, TestVectCalc):
+
+    def test_zero_copy(self):
+        buffers = []
+        data = pickle.dumps(self.orig_vc, protocol=5,
+                            buffer_callback=buffers.append)
+        self.assertEqual(len(buffers), 3)  # v1, v2 and v3
+        buffers = [bytearray(b.raw()) for b in buffers]  # as if received
+        clone = pickle.loads(data, buffers=buffers)
+        addresses = [numpy.frombuffer(b, dtype='u1').ctypes.data
+                     for b in buffers]
+        for name in ['v1', 'v2', 'v3']:
+            arr = clone.getv(name)
+            self.assertIn(arr.ctypes.data, addresses)
+            assert_equal(arr, self.orig_vc.getv(name))
+        clone.vec()
+        assert_equal(clone.v3, clone.v1 + clone.v2)
+
+
 class MixinTestCopyTest(object):
 
     """
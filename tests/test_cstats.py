@@ -0,0 +1,82 @@
+from nose.tools import ok_, assert_raises
+
+from tsutils import eq_
+from test_simobj import gene_vectcalc
+
+
+def test_disabled_by_default():
+    VectCalc = gene_vectcalc()
+    vc = VectCalc()
+    vc.vec()
+    stats = VectCalc.cstats()
+    eq_(sorted(stats), ['fill', 'subvec', 'subvec_dot', 'vec'])
+    eq_(stats['vec']['calls'], 0)
+
+
+def test_count_and_reset():
+    VectCalc = gene_vectcalc(_cstats_=True)
+    vc = VectCalc()
+    for _ in range(3):
+        vc.vec()
+    eq_(vc.subvec_dot(), 20)
+    stats = VectCalc.cstats(reset=True)
+    eq_(stats['vec']['calls'], 3)
+    eq_(stats['subvec_dot']['calls'], 1)
+    for s in [stats['vec'], stats['subvec_dot']]:
+        ok_(s['total'] >= s['max'] > 0)
+        ok_(s['total'] >= s['c'] > 0)
+        ok_(abs(s['python'] + s['c'] - s['total']) < 1e-9)
+        eq_(s['errors'], {})
+    eq_(VectCalc.cstats()['vec']['calls'], 0)
+
+
+def test_errors():
+    VectCalc = gene_vectcalc(_cstats_=True)
+    vc = VectCalc(v2=0)
+    for _ in range(2):
+        assert_raises(RuntimeError, vc.vec, op='divide')
+    # binding errors do not reach the C function
+    assert_raises(ValueError, vc.subvec_dot, i1=-1)
+    stats = VectCalc.cstats()
+    eq_(stats['vec']['calls'], 2)
+    eq_(stats['vec']['errors'], {1: 2})
+    eq_(stats['subvec_dot']['calls'], 0)
+
+
+def test_enable_at_runtime():
+    VectCalc = gene_vectcalc()
+    plain = VectCalc.vec
+    VectCalc.cstats(enable=True)
+    vc = VectCalc()
+    vc.vec()
+    VectCalc.cstats(enable=False)
+    vc.vec()
+    eq_(VectCalc.cstats()['vec']['calls'], 1)
+    eq_(VectCalc.vec.__code__.co_code, plain.__code__.co_code)
+
+
+def test_shared_with_subclass():
+    VectCalc = gene_vectcalc(_cstats_=True)
+
+    class SubVectCalc(VectCalc):
+        pass
+
+    SubVectCalc().vec()
+    eq_(VectCalc.cstats()['vec']['calls'], 1)
+    eq_(SubVectCalc.cstats()['vec']['calls'], 1)
+
+
+def test_cwrap():
+    calls = []
+
+    def _cwrap_vec(vec):
+        def wrapped(self, *args, **kwds):
+            calls.append(args)
+            return vec(self, *args, **kwds)
+        return wrapped
+
+    VectCalc = gene_vectcalc(_cwrap_vec=_cwrap_vec)
+    VectCalc.cstats(enable=True)
+    VectCalc().vec('minus')
+    eq_(calls, [('minus',)])
+    eq_(VectCalc.cstats()['vec']['calls'], 1)
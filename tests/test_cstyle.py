@@ -0,0 +1,48 @@
+import itertools
+from ctypes import cast
+
+import numpy
+from nose.tools import raises
+
+from tsutils import eq_
+from test_ctype_getter import deref
+from railgun.simobj import POINTER_nth, CDT2CTYPE, DTYPE2CDT
+try:
+    from railgun import cstyle
+except ImportError:
+    cstyle = None
+
+
+def check_cstyle(arr):
+    if cstyle is None:
+        return
+    cs = cstyle.CStyle(arr)
+    ctype = CDT2CTYPE[DTYPE2CDT[arr.dtype]]
+    ptr = cast(cs.pointer, POINTER_nth(ctype, arr.ndim))
+    for index in itertools.product(*map(range, arr.shape)):
+        eq_(deref(ptr, index), arr[index])
+
+
+def test_cstyle():
+    base = numpy.arange(2 * 3 * 2 * 2 * 3 * 2 * 2, dtype=numpy.double)
+    for ndim in range(2, 8):  # more than 5 (the old limit)
+        shape = (2, 3, 2, 2, 3, 2, 2)[:ndim]
+        arr = base[:numpy.prod(shape)].reshape(shape)
+        yield (check_cstyle, arr)
+    arr = base[:2 * 3 * 4].reshape((2, 3, 4))
+    yield (check_cstyle, arr[:, ::2, :])  # non-contiguous
+    yield (check_cstyle, arr[::-1])       # negative strides
+    yield (check_cstyle, numpy.zeros((0, 3, 4)))
+
+
+def test_maxdim():
+    if cstyle is None:
+        return
+    eq_(cstyle.MAXDIM >= 32, True)
+
+
+@raises(ValueError)
+def test_1d():
+    if cstyle is None:
+        raise ValueError
+    cstyle.CStyle(numpy.zeros(3))
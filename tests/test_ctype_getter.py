@@ -0,0 +1,28 @@
+import itertools
+
+import numpy
+
+from tsutils import eq_
+from railgun.simobj import ctype_getter
+
+
+def deref(ptr, index):
+    for i in index:
+        ptr = ptr[i]
+    return ptr
+
+
+def check_ctype_getter(arr):
+    ptr = ctype_getter(arr)
+    for index in itertools.product(*map(range, arr.shape)):
+        eq_(deref(ptr, index), arr[index])
+
+
+def test_ctype_getter():
+    base = numpy.arange(2 * 3 * 4 * 5 * 2 * 3 * 2, dtype=numpy.double)
+    for shape in [(7,), (3, 4), (2, 3, 4), (2, 3, 2, 2, 3, 2, 2)]:
+        arr = base[:numpy.prod(shape)].reshape(shape)
+        yield (check_ctype_getter, arr)
+    arr = base[:2 * 3 * 4].reshape((2, 3, 4))
+    yield (check_ctype_getter, arr[:, ::2, :])  # non-contiguous
+    yield (check_ctype_getter, arr[::-1])       # negative strides
@@ -0,0 +1,60 @@
+from ctypes import sizeof, c_size_t
+
+from tsutils import eq_
+from arrayaccess import gene_class_ArrayAccess
+from test_simobj import VectCalc, VectCalcCMemSubSet
+
+LIST_CDT = ['int', 'double']
+LIST_NUM = [7, 5, 3]
+NUMS = dict(num_i=7, num_j=5, num_k=3)
+
+
+def check_report_matches_estimate(cls, kwds):
+    obj = cls(**kwds)
+    eq_(obj.memory_report()['total'], cls.estimate_nbytes(**kwds))
+
+
+def test_report_matches_estimate():
+    ArrayAccess = gene_class_ArrayAccess('arrayaccess.so', 3, LIST_CDT)
+    FlatAccess = gene_class_ArrayAccess('arrayaccess.so', 3, LIST_CDT, 'flat')
+    for _calloc_ in [True, False]:
+        yield (check_report_matches_estimate, ArrayAccess,
+               dict(NUMS, _calloc_=_calloc_))
+    yield (check_report_matches_estimate, FlatAccess, NUMS)
+    yield (check_report_matches_estimate, VectCalc, {})
+    yield (check_report_matches_estimate, VectCalc, dict(num_i=100))
+    yield (check_report_matches_estimate, VectCalcCMemSubSet, {})
+    yield (check_report_matches_estimate, VectCalcCMemSubSet,
+           dict(_cmemsubsets_vec=True))
+
+
+def check_pointer_table(_calloc_):
+    ArrayAccess = gene_class_ArrayAccess('arrayaccess.so', 3, LIST_CDT)
+    aa = ArrayAccess(_calloc_=_calloc_, **NUMS)
+    members = aa.memory_report()['members']
+    ptr = sizeof(c_size_t)
+    eq_(members['double1d'], dict(data=7 * 8, spare=0, table=0,
+                                  total=7 * 8, memmap=False))
+    eq_(members['double2d']['table'], 7 * ptr)
+    eq_(members['double3d']['table'], (7 + 7 * 5) * ptr)
+    eq_(members['int3d']['total'], 7 * 5 * 3 * 4 + (7 + 7 * 5) * ptr)
+
+
+def test_pointer_table():
+    for _calloc_ in [True, False]:
+        yield (check_pointer_table, _calloc_)
+
+
+def test_subsets():
+    vc = VectCalcCMemSubSet()
+    report = vc.memory_report()
+    eq_(sorted(report['members']), ['v1', 'v2'])
+    eq_(report['subsets'], dict(vec=80, dot=80))
+    eq_(report['total'], 80 + report['struct'])
+
+
+def test_spare():
+    vc = VectCalc(num_i=10)
+    vc.reallocate(i=11, _preserve_=True)
+    rep = vc.memory_report()['members']['v1']
+    eq_((rep['data'], rep['spare'], rep['total']), (44, 36, 80))
@@ -1,6 +1,7 @@
-from nose.tools import raises
+from nose.tools import raises, eq_
 
 from railgun import SimObject, relpath
+from test_simobj import gene_vectcalc
 
 
 def check_cstructname_and_cfuncprefix(cstructname, cfuncprefix):
@@ -28,6 +29,8 @@ def check_cstructname_and_cfuncprefix(cstructname, cfuncprefix):
         if cfuncprefix is not None:
             _cfuncprefix_ = cfuncprefix
 
+    ClassNameIsNotVectCalc._cfinalize_()  # load C functions now
+
 
 def test_cstructname_and_cfuncprefix():
     raises_nothing = check_cstructname_and_cfuncprefix
@@ -62,9 +65,64 @@ def check_empty_cfuncprefix(cfuncprefix):
         if cfuncprefix is not None:
             _cfuncprefix_ = cfuncprefix
 
+    ClassNameIsNotVectCalc._cfinalize_()  # load C functions now
+
 
 def test_empty_cfuncprefix():
     raises_nothing = check_empty_cfuncprefix
     raises_AttributeError = raises(AttributeError)(raises_nothing)
     yield (raises_nothing, '')
     yield (raises_AttributeError, None)
+
+
+def test_lazy_instantiation():
+    cls = gene_vectcalc()
+    assert vars(cls)['_cfinalized_'] is False
+    assert '_cfuncs_parsed_' not in vars(cls)
+    obj = cls(num_i=3)
+    assert vars(cls)['_cfinalized_'] is True
+    obj.fill(1, 'v1')
+    assert list(obj.v1) == [1, 1, 1]
+
+
+def test_lazy_attribute():
+    cls = gene_vectcalc()
+    assert sorted(cls.cinfo.indices) == ['i']
+    assert vars(cls)['_cfinalized_'] is True
+    assert not hasattr(cls, 'no_such_attribute')
+
+
+def test_lazy_subclass():
+    base = gene_vectcalc()
+    sub = type(base)('SubVectCalc', (base,), {})
+    assert vars(base)['_cfinalized_'] is False
+    assert sub(num_i=2).num_i == 2
+    assert vars(base)['_cfinalized_'] is True
+
+
+def test_eager():
+    cls = gene_vectcalc(_clazy_=False)
+    assert vars(cls)['_cfinalized_'] is True
+
+
+@raises(AttributeError)
+def test_lazy_error():
+    cls = gene_vectcalc(_cfuncprefix_='WrongPrefix_')
+    cls(num_i=2)
+
+
+def test_cfunc_loaded_on_demand():
+    cls = gene_vectcalc()
+    loaded = cls._cfunc_loaded_
+    # only the default choices are loaded
+    eq_(sorted(loaded), ['fill_v1', 'subvec_dot', 'subvec_plus', 'vec_plus'])
+    eq_(len(loaded.declarations), 4 + 4 + 3 + 1)
+    obj = cls(num_i=3)
+    obj.vec(op='times')
+    assert 'vec_times' in loaded
+    assert 'vec_minus' not in loaded
+
+
+@raises(KeyError)
+def test_cfunc_loaded_undeclared():
+    gene_vectcalc()._cfunc_loaded_['vec_no_such_op']
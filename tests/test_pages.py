@@ -0,0 +1,61 @@
+import unittest
+
+import numpy
+from numpy.testing import assert_equal
+
+from railgun import SimObjectArray
+from railgun import pages
+from test_simobj import VectCalc, gene_vectcalc
+
+
+class TestPages(unittest.TestCase):
+
+    def test_default(self):
+        vc = VectCalc()
+        self.assertEqual(vc.page_policy()['v1'],
+                         dict(hugepages=False, prefault=0))
+
+    def test_prefault(self):
+        Paged = gene_vectcalc(_cprefault_=3)
+        vc = Paged(num_i=10 ** 5, v2=3)
+        self.assertEqual(vc.page_policy()['v1']['prefault'], 3)
+        assert_equal(vc.v1, 1)
+        vc.vec(op='times')
+        assert_equal(vc.v3, 3)
+
+    def test_hugepages(self):
+        Paged = gene_vectcalc(_chugepages_={'v3': True})
+        vc = Paged(num_i=10 ** 5)
+        policy = vc.page_policy()
+        self.assertEqual(policy['v1']['hugepages'], False)
+        expected = (getattr(pages.mmap, 'MADV_HUGEPAGE', None) is not None
+                    and pages.thp_mode() not in [None, 'never'])
+        if expected:
+            self.assertEqual(policy['v3']['hugepages'], True)
+            self.assertEqual(vc.v3.ctypes.data % pages.HUGEPAGESIZE, 0)
+        vc.vec()
+        assert_equal(vc.v3, 3)
+
+    def test_reallocate(self):
+        Paged = gene_vectcalc(_cprefault_=True)
+        vc = Paged()
+        vc.reallocate(i=100, _preserve_=True)
+        self.assertNotEqual(vc.page_policy()['v1']['prefault'], 0)
+        vc.reallocate(i=50)
+        self.assertNotEqual(vc.page_policy()['v1']['prefault'], 0)
+
+    def test_bind(self):
+        Paged = gene_vectcalc(_cprefault_=1)
+        vc = Paged()
+        self.assertRaises(ValueError, vc.bind, v1=numpy.zeros(10, 'i'))
+        arr = pages.alloc_pages(40).view(numpy.int32)
+        vc.bind(v1=arr)
+        self.assertIs(vc.v1, arr)
+
+    def test_simobjarray(self):
+        Paged = gene_vectcalc(_cprefault_=2)
+        ens = SimObjectArray(Paged, 4, num_i=10 ** 4, v2=2)
+        self.assertEqual(pages.policy_of(ens.v1)['prefault'], 2)
+        ens.vec()
+        assert_equal(ens.v3, 3)
+        self.assertEqual(ens[0].page_policy()['v3']['prefault'], 2)
@@ -0,0 +1,143 @@
+import gc
+import unittest
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy
+from numpy.testing import assert_equal
+
+from railgun import SimObject, parallel
+from railgun.parallel import ThreadPoolRunner, ProcessPoolRunner
+from test_simobj import VectCalc
+from test_cerrors import VectCalcBase
+
+
+class VectCalcZeroDivision(VectCalcBase):
+    _cerrors_ = {1: ZeroDivisionError()}
+
+
+class VectCalcRetV3(SimObject):
+    _cstructname_ = 'VectCalc'
+    _clibname_ = VectCalc._clibname_
+    _clibdir_ = VectCalc._clibdir_
+    _cmembers_ = VectCalc._cmembers_
+    _cfuncs_ = ["v3 vec_{op | plus, minus, times, divide}()"]
+
+
+def worker_blocks():
+    return sorted(parallel._worker_blocks)
+
+
+class TestThreadPoolRunner(unittest.TestCase):
+
+    Runner = ThreadPoolRunner
+    num_objs = 8
+
+    def setUp(self):
+        self.runner = self.Runner(max_workers=4)
+
+    def tearDown(self):
+        self.runner.shutdown()
+
+    def make_objs(self, simclass=VectCalc):
+        return [simclass(v1=numpy.arange(10) * k, v2=numpy.arange(1, 11) + k)
+                for k in range(self.num_objs)]
+
+    def test_map_no_ret(self):
+        objs = self.make_objs()
+        futures = self.runner.map(objs, 'vec', op='times')
+        self.assertEqual([f.result() for f in futures],
+                         [None] * self.num_objs)
+        for obj in self.fetch(objs):
+            assert_equal(obj.v3, obj.v1 * obj.v2)
+
+    def test_map_ret(self):
+        objs = self.make_objs()
+        futures = self.runner.map(objs, 'subvec_dot', 2, i2=7)
+        desired = [numpy.dot(obj.v1[2:7], obj.v2[2:7]) for obj in objs]
+        self.assertEqual([f.result() for f in futures], desired)
+
+    def test_submit_same_object(self):
+        (obj,) = self.make_objs()[:1]
+        futures = [self.runner.submit(obj, 'subvec_dot', i1)
+                   for i1 in range(10)]
+        desired = [numpy.dot(obj.v1[i1:], obj.v2[i1:]) for i1 in range(10)]
+        self.assertEqual([f.result() for f in futures], desired)
+
+    def test_errors(self):
+        objs = self.make_objs(VectCalcZeroDivision)
+        objs[1].v2[0] = 0
+        futures = self.runner.map(objs, 'vec', op='divide')
+        self.assertIsNone(futures[0].exception())
+        self.assertIsInstance(futures[1].exception(), ZeroDivisionError)
+        futures = self.runner.map(objs, 'subvec', i1=-1)
+        self.assertIsInstance(futures[0].exception(), ValueError)
+
+    def test_no_reference_to_objects(self):
+        objs = self.make_objs()
+        [f.result() for f in self.runner.map(objs, 'vec')]
+        refs = [weakref.ref(obj) for obj in objs]
+        del objs
+        gc.collect()
+        self.assertEqual([r() for r in refs], [None] * self.num_objs)
+        # per-object tables do not grow
+        for name in ['_locks', '_last']:
+            if hasattr(self.runner, name):
+                self.assertEqual(len(getattr(self.runner, name)), 0)
+
+    def fetch(self, objs):
+        return objs
+
+
+class TestProcessPoolRunner(TestThreadPoolRunner):
+
+    Runner = ProcessPoolRunner
+
+    def test_share(self):
+        (obj,) = self.make_objs()[:1]
+        v1 = obj.v1.copy()
+        self.runner.share(obj)
+        assert_equal(obj.v1, v1)
+        store = obj._cdatastore_
+        self.assertIs(store['SharedMemory:v1'][1], obj.v1)
+        shared = dict((k, store[k]) for k in store)
+        self.runner.share(obj)
+        for k in shared:
+            self.assertIs(store[k], shared[k])
+
+    def test_ret_shared_array(self):
+        objs = self.make_objs(VectCalcRetV3)
+        futures = self.runner.map(objs, 'vec')
+        for (obj, f) in zip(objs, futures):
+            self.assertIs(f.result(), obj.v3)
+            assert_equal(obj.v3, obj.v1 + obj.v2)
+
+    def test_reallocate_releases_shared_memory(self):
+        executor = ProcessPoolExecutor(max_workers=1)
+        runner = ProcessPoolRunner(executor=executor)
+        try:
+            obj = VectCalc()
+            for n in range(11, 16):
+                obj.reallocate(i=n)
+                runner.submit(obj, 'vec').result()
+                names = sorted(obj._cdatastore_['SharedMemory:%s' % v][0].name
+                               for v in ['v1', 'v2', 'v3'])
+                self.assertEqual(sorted(runner._blocks), names)
+                self.assertEqual(executor.submit(worker_blocks).result(),
+                                 names)
+        finally:
+            runner.shutdown()
+            executor.shutdown()
+
+    def test_attached_blocks_are_kept(self):
+        executor = ProcessPoolExecutor(max_workers=1)
+        runner = ProcessPoolRunner(executor=executor)
+        try:
+            objs = [VectCalc(), VectCalc()]
+            for obj in objs * 2:
+                runner.submit(obj, 'vec').result()
+            self.assertEqual(executor.submit(worker_blocks).result(),
+                             sorted(runner._blocks))
+        finally:
+            runner.shutdown()
+            executor.shutdown()
@@ -41,6 +41,23 @@ class VectCalc(SimObject):
         ]
 
 
+def gene_vectcalc(**attrs):
+    """
+    Make a new class with the declarations of `VectCalc` and `attrs`
+
+    Unlike subclasses of `VectCalc`, the class is finalized on its own,
+    so that class-level settings such as `_cstats_` and `_clazy_` are
+    not shared with other classes.
+    """
+    decls = dict(_cstructname_='VectCalc',
+                 _clibname_=VectCalc._clibname_,
+                 _clibdir_=VectCalc._clibdir_,
+                 _cmembers_=VectCalc._cmembers_,
+                 _cfuncs_=VectCalc._cfuncs_)
+    decls.update(attrs)
+    return type('VectCalc', (SimObject,), decls)
+
+
 class VectCalcWithCwrap(SimObject):
     _cstructname_ = 'VectCalc'
     _clibname_ = VectCalc._clibname_
@@ -0,0 +1,75 @@
+import unittest
+
+import numpy
+from numpy.testing import assert_equal
+
+from tsutils import eq_
+from railgun import SimObjectArray
+from arrayaccess import gene_class_ArrayAccess
+from test_arrayaccess import LIST_NUM, LIST_CDT
+from test_simobj import VectCalc
+
+
+class TestSimObjectArray(unittest.TestCase):
+
+    num = 5
+
+    def setUp(self):
+        self.ens = SimObjectArray(VectCalc, self.num, num_i=4, v2=3)
+
+    def test_shape(self):
+        eq_(len(self.ens), self.num)
+        eq_(self.ens.v1.shape, (self.num, 4))
+        eq_(self.ens.ans.shape, (self.num,))
+        assert_equal(self.ens.v1, 1)  # default
+        assert_equal(self.ens.v2, 3)  # keyword argument
+        assert_equal(self.ens.num_i, 4)
+
+    def test_elements_view_slabs(self):
+        ens = self.ens
+        ens.v1 = numpy.arange(self.num)[:, None]
+        for (i, obj) in enumerate(ens):
+            assert_equal(obj.v1, i)
+            obj.v2[:] = i * 10
+        for i in range(self.num):
+            assert_equal(ens.v2[i], i * 10)
+        ens.ans = numpy.arange(self.num)
+        eq_([obj.ans for obj in ens], list(range(self.num)))
+        ens[2].ans = 100
+        eq_(ens.ans[2], 100)
+
+    def test_call(self):
+        ens = self.ens
+        ens.v1 = numpy.arange(self.num * 4).reshape((self.num, 4))
+        ret = ens.vec(op='times')
+        eq_(ret, None)
+        assert_equal(ens.v3, ens.v1 * 3)
+        ans = ens.subvec_dot(1, 3)
+        assert_equal(ans, ens.v1[:, 1:3].sum(axis=1) * 3)
+        assert_equal(ans, ens.ans)
+
+    def test_num_readonly(self):
+        def set_num():
+            self.ens.num_i = 10
+        self.assertRaises(AttributeError, set_num)
+
+    def test_iliffe(self):
+        ArrayAccess = gene_class_ArrayAccess(
+            'arrayaccess.so', len(LIST_NUM), LIST_CDT)
+        nums = dict(zip(ArrayAccess.num_names, [3, 2, 2, 2, 2]))
+        for _calloc_ in [True, False]:
+            ens = SimObjectArray(ArrayAccess, 3, _calloc_=_calloc_, **nums)
+            ens.int3d = numpy.arange(ens.int3d.size).reshape(ens.int3d.shape)
+            for (i, obj) in enumerate(ens):
+                assert_equal(obj.arr_via_ret('int', 3), ens.int3d[i])
+
+    def test_char_scalar(self):
+        ArrayAccess = gene_class_ArrayAccess(
+            'arrayaccess.so', len(LIST_NUM), LIST_CDT)
+        nums = dict(zip(ArrayAccess.num_names, [3, 2, 2, 2, 2]))
+        ens = SimObjectArray(ArrayAccess, 3, ret_char=b'a', **nums)
+        eq_(list(ens.ret_char), [b'a'] * 3)
+        ens.ret_char = [b'x', b'y', b'z']
+        eq_([obj.ret_char for obj in ens], [b'x', b'y', b'z'])
+        ens[1].ret_char = b'w'
+        eq_(ens.ret_char[1], b'w')
@@ -0,0 +1,65 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from tsutils import eq_
+from railgun import simobj, speccache
+from test_simobj import VectCalcCMemObject, gene_vectcalc
+
+
+class TestSpecCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cachedir = tempfile.mkdtemp()
+        self.orig_env = os.environ.get(speccache.CACHE_DIR_ENV)
+        os.environ[speccache.CACHE_DIR_ENV] = self.cachedir
+        self.orig_parse_spec = simobj.parse_spec
+
+    def tearDown(self):
+        simobj.parse_spec = self.orig_parse_spec
+        if self.orig_env is None:
+            del os.environ[speccache.CACHE_DIR_ENV]
+        else:
+            os.environ[speccache.CACHE_DIR_ENV] = self.orig_env
+        shutil.rmtree(self.cachedir)
+
+    def cachefiles(self):
+        return sorted(os.listdir(self.cachedir))
+
+    def check_vectcalc(self, cls):
+        obj = cls(num_i=3)
+        obj.fill(2, 'v1')
+        obj.fill(3, 'v2')
+        obj.vec(op='times')
+        eq_(list(obj.v3), [6, 6, 6])
+        eq_(obj.subvec_dot(), 18)
+
+    def test_load_from_cache(self):
+        self.check_vectcalc(gene_vectcalc())
+        eq_(len(self.cachefiles()), 1)
+
+        def parse_spec(*args):
+            raise AssertionError('parse_spec must not be called')
+        simobj.parse_spec = parse_spec
+        self.check_vectcalc(gene_vectcalc())
+
+    def test_different_declarations(self):
+        gene_vectcalc()._cfinalize_()
+        gene_vectcalc(_cmemsubsets_=dict(
+            sub=dict(funcs=['subvec_dot'], members=['ans'])))._cfinalize_()
+        eq_(len(self.cachefiles()), 2)
+
+    def test_broken_cache(self):
+        gene_vectcalc()._cfinalize_()
+        for name in self.cachefiles():
+            with open(os.path.join(self.cachedir, name), 'wb') as f:
+                f.write(b'broken')
+        self.check_vectcalc(gene_vectcalc())
+
+    def test_cmem_object_not_cached(self):
+        spec = speccache.cached(
+            simobj.parse_spec, VectCalcCMemObject._cmembers_,
+            VectCalcCMemObject._cfuncs_, None)
+        eq_(sorted(spec['cmems_parsed']), ['ans', 'num_i', 'v1', 'v2', 'v3'])
+        eq_(self.cachefiles(), [])
@@ -0,0 +1,46 @@
+import unittest
+
+import numpy
+from numpy.testing import assert_equal
+
+from tsutils import eq_
+from test_simobj import VectCalc
+
+
+class VectCalcCumsum(VectCalc):
+    _cstructname_ = 'VectCalc'
+    _cfuncs_ = VectCalc._cfuncs_ + ['cumsum()']
+
+
+class TestStream(unittest.TestCase):
+
+    def setUp(self):
+        self.vc = VectCalcCumsum(num_i=5, v1=numpy.arange(5))
+
+    def test_carry(self):
+        chunks = list(self.vc.stream('cumsum', 3, 'v3', copy=True))
+        eq_([len(c) for c in chunks], [5, 4, 4])
+        assert_equal(numpy.concatenate(chunks),
+                     numpy.cumsum([0] + [1, 2, 3, 4] * 3))
+
+    def test_views(self):
+        chunks = list(self.vc.stream('cumsum', 2, 'v3'))
+        # the buffer is reused
+        assert numpy.may_share_memory(chunks[0], chunks[1])
+        assert_equal(chunks[1], self.vc.v3[1:])
+
+    def test_members(self):
+        for (i, (v3, ans)) in enumerate(
+                self.vc.stream('cumsum', 3, ['v3', 'ans'])):
+            eq_(v3[-1], 10 * (i + 1))
+            eq_(ans, 0)
+
+    def test_no_carry(self):
+        chunks = list(self.vc.stream('cumsum', 2, 'v3', carry=[], copy=True))
+        eq_([len(c) for c in chunks], [5, 5])
+        assert_equal(chunks[0], chunks[1])
+
+    def test_infinite(self):
+        stream = self.vc.stream('vec', members=['v3'], args=('times',))
+        for (i, (v3,)) in zip(range(3), stream):
+            assert_equal(v3[-4:], (self.vc.v1 * self.vc.v2)[-4:])